@@ -4,6 +4,7 @@ import pandas as pd
 from pydantic import BaseModel, Field, EmailStr, ValidationError
 import re
 import os
+from pagination import page_params, page_controls
 
 API_URL = os.getenv('API_URL', 'http://localhost:8000')  # Fallback to localhost for local development
 
@@ -52,15 +53,16 @@ def search_author():
 
     show_all = st.checkbox("Show All Authors")
     if show_all:
-        response = requests.get(f"{base_url}/all/")
+        response = requests.get(f"{base_url}/all", params=page_params("authors"))
         if response.status_code == 200:
             data = response.json()
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
+            if isinstance(data, dict) and "items" in data:
+                df = pd.DataFrame(data["items"])
                 desired_order = ['id', 'first_name', 'midname_initial' ,'last_name']
                 st.dataframe(df, use_container_width=True, hide_index=True, column_order=desired_order)
+                page_controls("authors", data["next_cursor"])
             else:
-                st.error("Data format is not a list.")
+                st.error("Data format is not a page.")
         else:
             st.error(f"Failed to fetch authors: {response.json().get('detail', 'Unknown error')}")
     
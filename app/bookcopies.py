@@ -44,6 +44,21 @@ def show_available_bookcopies():
     else:
         st.error(f"Failed to fetch available book copies: {response.json().get('detail', 'Unknown error')}")
 
+def show_title_availability():
+    st.title("Title Availability")
+    isbn = st.text_input("Enter ISBN")
+    if st.button("Check"):
+        response = requests.get(f"{API_URL}/book/{isbn}/availability")
+        if response.status_code == 200:
+            counts = response.json()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(label="Total Copies", value=counts["total"])
+            col2.metric(label="Available", value=counts["available"])
+            col3.metric(label="On Loan", value=counts["on_loan"])
+            col4.metric(label="Overdue", value=counts["overdue"])
+        else:
+            st.error(f"Failed to fetch availability: {response.json().get('detail', 'Unknown error')}")
+
 def get_unreturned_count():
     st.title("Unreturned Book Copies Count")
     response = requests.get(f"{base_url}/unreturnedcount")
@@ -56,7 +71,7 @@ def get_unreturned_count():
 def bookcopies_page():
     st.sidebar.title("Book Copy Management")
 
-    options = ["Book Copy Count", "Overdue Book Copies", "Available Book Copies", "Unreturned Book Copies Count"]
+    options = ["Book Copy Count", "Overdue Book Copies", "Available Book Copies", "Title Availability", "Unreturned Book Copies Count"]
     choice = st.sidebar.selectbox("Select Operation", options)
 
     if choice == "Book Copy Count":
@@ -65,6 +80,8 @@ def bookcopies_page():
         show_overdue_bookcopies()
     elif choice == "Available Book Copies":
         show_available_bookcopies()
+    elif choice == "Title Availability":
+        show_title_availability()
     elif choice == "Unreturned Book Copies Count":
         get_unreturned_count()
 
@@ -4,6 +4,7 @@ import pandas as pd
 from pydantic import BaseModel, Field, ValidationError
 import datetime
 import os
+from pagination import page_params, page_controls
 
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
@@ -25,46 +26,20 @@ class UpdateBook(BaseModel):
     genre: str | None = Field(min_length=1, max_length=25, default=None)
     published_year: int | None = Field(default=None)
 
-def get_authors():
+def get_authors(prefix: str = ""):
     try:
-        response = requests.get(f"{API_URL}/author/all/")
+        response = requests.get(f"{API_URL}/author/autocomplete", params={"q": prefix})
         response.raise_for_status()
-        authors = response.json()
-
-        if isinstance(authors, list):
-            if authors:
-                return {f"{author['first_name']} {author['last_name']}": author['id'] for author in authors}
-            else:
-                st.warning("No authors added yet.")
-                return {}
-        elif isinstance(authors, dict) and 'message' in authors:
-            st.warning(authors['message'])
-            return {}
-        else:
-            st.error("Unexpected response format from the API.")
-            return {}
+        return {author['label']: author['id'] for author in response.json()}
     except requests.RequestException as e:
         st.error(f"Error fetching authors: {e}")
         return {}
 
-def get_publishers():
+def get_publishers(prefix: str = ""):
     try:
-        response = requests.get(f"{API_URL}/publisher/all/")
+        response = requests.get(f"{API_URL}/publisher/autocomplete", params={"q": prefix})
         response.raise_for_status()
-        publishers = response.json()
-
-        if isinstance(publishers, list):
-            if publishers:
-                return {f"{publisher['name']}": publisher['id'] for publisher in publishers}
-            else:
-                st.warning("No publishers added yet.")
-                return {}
-        elif isinstance(publishers, dict) and 'message' in publishers:
-            st.warning(publishers['message'])
-            return {}
-        else:
-            st.error("Unexpected response format from the API.")
-            return {}
+        return {publisher['label']: publisher['id'] for publisher in response.json()}
     except requests.RequestException as e:
         st.error(f"Error fetching publishers: {e}")
         return {}
@@ -72,8 +47,8 @@ def get_publishers():
 def create_book():
     st.title("Create Book")
 
-    authors = get_authors()  # Fetch authors
-    publishers = get_publishers()  # Fetch publishers
+    authors = get_authors(st.text_input("Find Author", help="Type the start of any part of the author's name"))
+    publishers = get_publishers(st.text_input("Find Publisher", help="Type the start of any word in the publisher's name"))
 
     with st.form(key="create_book_form"):
         isbn = st.text_input("ISBN")
@@ -117,15 +92,16 @@ def search_book():
 
     show_all = st.checkbox("Show All Books")
     if show_all:
-        response = requests.get(f"{base_url}/all")
+        response = requests.get(f"{base_url}/all", params=page_params("books"))
         if response.status_code == 200:
             data = response.json()
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
+            if isinstance(data, dict) and "items" in data:
+                df = pd.DataFrame(data["items"])
                 desired_order = ['isbn', 'title', 'genre', 'author_id', 'publisher_id', 'published_year', 'qty']
                 st.dataframe(df, use_container_width=True, hide_index=True, column_order=desired_order)
+                page_controls("books", data["next_cursor"])
             else:
-                st.error("Data format is not a list.")
+                st.error("Data format is not a page.")
         else:
             st.error(f"Failed to fetch books: {response.json().get('detail', 'Unknown error')}")
     
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field, ValidationError
 from datetime import date
 import json
 import os
+from pagination import page_params, page_controls
 
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
@@ -56,14 +57,15 @@ def create_borrow():
 def show_borrows():
     st.title("Show Borrows")
 
-    response = requests.get(f"{base_url}/all")
+    response = requests.get(f"{base_url}/all", params=page_params("borrows"))
     if response.status_code == 200:
         data = response.json()
-        if isinstance(data, list):
-            df = pd.DataFrame(data)
+        if isinstance(data, dict) and "items" in data:
+            df = pd.DataFrame(data["items"])
             st.dataframe(df, use_container_width=True, hide_index=True)
+            page_controls("borrows", data["next_cursor"])
         else:
-            st.error("Data format is not a list.")
+            st.error("Data format is not a page.")
     else:
         st.error(f"Failed to fetch borrows: {response.json().get('detail', 'Unknown error')}")
 
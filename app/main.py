@@ -35,10 +35,6 @@ def get_metric(endpoint: str):
         st.error(e)
         return None
 
-def safe_get_metric(endpoint: str):
-    value = get_metric(endpoint)
-    return int(value) if value is not None else None
-
     
 
 hide_streamlit_style = """<style>header[data-testid="stHeader"] {display: none;} ul[data-testid="main-menu"] {display: none;} div[data-testid="stStatusWidget"] {display: none;} div[data-testid="stToolbar"] {display: none;} #root > div:nth-child(1) > div > div > div > div > section > div {padding-top: 0rem;}</style>"""
@@ -50,15 +46,15 @@ def main_page():
     st.markdown("<h1 style='text-align: center;'>Library Statistics</h1>", unsafe_allow_html=True)
     add_vertical_space(2)
 
-    patron_count = safe_get_metric("/patron/count")
-    patron_total_fine = safe_get_metric("/patron/finetotal")
-    author_count = safe_get_metric("/author/count")
-    book_count = safe_get_metric("/book/count")
-    publisher_count = safe_get_metric("/publisher/count")
-    transaction_count = safe_get_metric("/borrows/count")
-    bookcopies_count = safe_get_metric("/bookcopy/count")
-    unreturned_bookcopies_count = safe_get_metric("/bookcopy/unreturnedcount")
-    available_copies = int(bookcopies_count) - int(unreturned_bookcopies_count) if bookcopies_count is not None and unreturned_bookcopies_count is not None else None
+    stats = get_metric("/stats") or {}
+    patron_count = stats.get("patrons")
+    patron_total_fine = stats.get("fine_total")
+    author_count = stats.get("authors")
+    book_count = stats.get("books")
+    publisher_count = stats.get("publishers")
+    transaction_count = stats.get("transactions")
+    unreturned_bookcopies_count = stats.get("unreturned_bookcopies")
+    available_copies = stats.get("available_bookcopies")
 
     col1, col2, col3, col4 = st.columns(4, gap="small", vertical_alignment="top")
 
@@ -0,0 +1,22 @@
+import streamlit as st
+
+PAGE_SIZE = 100
+
+def page_params(key: str, limit: int = PAGE_SIZE):
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    params = {"limit": limit}
+    if cursors[-1] is not None:
+        params["after"] = cursors[-1]
+    return params
+
+def page_controls(key: str, next_cursor):
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Previous page", key=f"{key}_previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Next page", key=f"{key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
\ No newline at end of file
@@ -5,6 +5,7 @@ import datetime
 import pandas as pd
 from pydantic import BaseModel, EmailStr, Field, field_validator, ValidationError, ValidationInfo
 import os
+from pagination import page_params, page_controls
 
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
@@ -119,15 +120,16 @@ def search_patron():
 
     show_all = st.checkbox("Show All Patrons")
     if show_all:
-        response = requests.get(f"{base_url}/all")
+        response = requests.get(f"{base_url}/all", params=page_params("patrons"))
         if response.status_code == 200:
             data = response.json()
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
+            if isinstance(data, dict) and "items" in data:
+                df = pd.DataFrame(data["items"])
                 desired_order = ['id', 'first_name', 'last_name', 'email', 'phone', 'status', 'fine']
                 st.dataframe(df, use_container_width=True, hide_index=True, column_order=desired_order)
+                page_controls("patrons", data["next_cursor"])
             else:
-                st.error("Data format is not a list.")
+                st.error("Data format is not a page.")
         else:
             st.error(f"Failed to fetch patrons: {response.json().get('detail', 'Unknown error')}")
     
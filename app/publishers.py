@@ -3,6 +3,7 @@ import requests
 import pandas as pd
 from pydantic import BaseModel, Field, ValidationError
 import os
+from pagination import page_params, page_controls
 
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
@@ -41,14 +42,15 @@ def search_publisher():
 
     show_all = st.checkbox("Show All Publishers")
     if show_all:
-        response = requests.get(f"{base_url}/all/")
+        response = requests.get(f"{base_url}/all", params=page_params("publishers"))
         if response.status_code == 200:
             data = response.json()
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
+            if isinstance(data, dict) and "items" in data:
+                df = pd.DataFrame(data["items"])
                 st.dataframe(df, use_container_width=True, hide_index=True)
+                page_controls("publishers", data["next_cursor"])
             else:
-                st.error("Data format is not a list.")
+                st.error("Data format is not a page.")
         else:
             st.error(f"Failed to fetch publishers: {response.json().get('detail', 'Unknown error')}")
     else:
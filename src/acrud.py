@@ -0,0 +1,100 @@
+from database import async_engine
+from datetime import date
+from models import Patron, Publisher, Author, Book, Borrows
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from exceptions import DBIntegrityError
+from sqlalchemy.exc import IntegrityError, DatabaseError
+from crud import borrow_details_query, borrow_details, available_bookcopies_query, available_bookcopy_details, overdue_bookcopies_query, keyset_query, keyset_page, PAGE_SIZE
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+# Patron reads
+async def get_all_patrons(session: AsyncSession, limit: int = PAGE_SIZE, after: str | None = None):
+    try:
+        patrons = (await session.exec(keyset_query(select(Patron), Patron.id, limit, after))).all()
+        return keyset_page(patrons, limit, lambda patron: patron.id)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+# Book reads
+async def get_all_books(session: AsyncSession, limit: int = PAGE_SIZE, after: str | None = None):
+    try:
+        books = (await session.exec(keyset_query(select(Book), Book.isbn, limit, after))).all()
+        return keyset_page(books, limit, lambda book: book.isbn)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+# Author reads
+async def get_all_authors(session: AsyncSession, limit: int = PAGE_SIZE, after: int | None = None):
+    try:
+        authors = (await session.exec(keyset_query(select(Author), Author.id, limit, after))).all()
+        return keyset_page(authors, limit, lambda author: author.id)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+# Publisher reads
+async def get_all_publishers(session: AsyncSession, limit: int = PAGE_SIZE, after: int | None = None):
+    try:
+        publishers = (await session.exec(keyset_query(select(Publisher), Publisher.id, limit, after))).all()
+        return keyset_page(publishers, limit, lambda publisher: publisher.id)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+# Bookcopy reads
+async def get_available_bookcopies(session: AsyncSession):
+    try:
+        result = (await session.exec(available_bookcopies_query())).all()
+        if not result:
+            return []
+        return available_bookcopy_details(result)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+async def get_overdue_bookcopies(session: AsyncSession):
+    try:
+        result = (await session.exec(overdue_bookcopies_query(date.today()))).all()
+        if not result:
+            return []
+        return borrow_details(result)
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
+
+# Borrow reads
+async def get_all_borrows(session: AsyncSession, limit: int = PAGE_SIZE, after: int | None = None):
+    try:
+        result = (await session.exec(keyset_query(borrow_details_query(), Borrows.id, limit, after))).all()
+        return keyset_page(borrow_details(result), limit, lambda borrow: borrow["borrow_id"])
+    except IntegrityError:
+        await session.rollback()
+        raise DBIntegrityError
+    except DatabaseError:
+        await session.rollback()
+        raise DatabaseError
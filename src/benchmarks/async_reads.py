@@ -0,0 +1,61 @@
+from benchmarks.common import timed, report, seed
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+import argparse
+import asyncio
+import crud
+import acrud
+import database
+import migrations
+import random
+
+# page through /borrows/all the way each mode serves it: sync handlers on a thread pool, async handlers on one event loop
+
+
+def sync_pages(engine, borrows: int, pages: int, limit: int, worker: int):
+    rnd = random.Random(worker)
+    for _ in range(pages):
+        with Session(engine) as session:
+            crud.get_all_borrows(session, limit, rnd.randrange(borrows))
+
+def run_sync(engine, concurrency: int, borrows: int, pages: int, limit: int):
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(sync_pages, engine, borrows, pages, limit, worker) for worker in range(concurrency)]
+        for future in futures:
+            future.result()
+
+async def async_pages(engine, borrows: int, pages: int, limit: int, worker: int):
+    rnd = random.Random(worker)
+    for _ in range(pages):
+        async with AsyncSession(engine) as session:
+            await acrud.get_all_borrows(session, limit, rnd.randrange(borrows))
+
+async def run_async(concurrency: int, borrows: int, pages: int, limit: int):
+    engine = database.create_async_db_engine()
+    try:
+        await asyncio.gather(*[async_pages(engine, borrows, pages, limit, worker) for worker in range(concurrency)])
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="sync vs async read path benchmark")
+    parser.add_argument("--borrows", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=crud.PAGE_SIZE)
+    args = parser.parse_args()
+
+    migrations.upgrade(database.engine)
+    with database.engine.begin() as connection:
+        seed(connection, max(args.borrows // 20, 1), args.borrows, date.today())
+    operations = args.concurrency * args.pages
+
+    seconds, _ = timed(run_sync, database.engine, args.concurrency, args.borrows, args.pages, args.limit)
+    report(f"sync, {args.concurrency} threads", seconds, operations)
+    seconds, _ = timed(asyncio.run, run_async(args.concurrency, args.borrows, args.pages, args.limit))
+    report(f"async, {args.concurrency} tasks", seconds, operations)
+
+if __name__ == "__main__":
+    main()
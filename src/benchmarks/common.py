@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="biblio-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATA_DIR, 'bench.db')}"
+
+from datetime import date, timedelta
+from sqlalchemy import insert
+from models import PatronStatusEnum, Patron, Author, Publisher, Book, BookCopy, Borrows
+import random
+import time
+
+
+def database_url(name: str):
+    return f"sqlite:///{os.path.join(DATA_DIR, name)}"
+
+def timed(operation, *args, **kwargs):
+    started = time.perf_counter()
+    result = operation(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def report(label: str, seconds: float, operations: int):
+    print(f"{label:<48} {seconds:8.2f}s {operations / seconds:12.0f} ops/s")
+
+def seed(connection, patrons: int, borrows: int, today: date, open_share: float = 0.3, seed: int = 7):
+    rnd = random.Random(seed)
+    connection.execute(insert(Patron), [
+        {
+            "id": f"{number:010d}",
+            "first_name": "Bench",
+            "last_name": f"Patron{number}",
+            "email": f"patron{number}@example.org",
+            "phone": f"{number:010d}",
+            "status": PatronStatusEnum.INACTIVE,
+            "fine": 0,
+            "open_loans": 0
+        }
+        for number in range(patrons)
+    ])
+    if not borrows:
+        return
+    books = max(borrows // 10, 1)
+    connection.execute(insert(Author), [
+        {"id": number + 1, "first_name": "Bench", "midname_initial": "B", "last_name": f"Author{number}"}
+        for number in range(500)
+    ])
+    connection.execute(insert(Publisher), [{"id": number + 1, "name": f"Bench Publisher {number}"} for number in range(50)])
+    connection.execute(insert(Book), [
+        {
+            "isbn": f"{9780000000000 + number}",
+            "title": f"Benchmark title {number}",
+            "genre": f"Genre {number % 40}",
+            "author_id": number % 500 + 1,
+            "publisher_id": number % 50 + 1,
+            "published_year": 1950 + number % 70,
+            "qty": 10
+        }
+        for number in range(books)
+    ])
+    connection.execute(insert(BookCopy), [{"isbn": f"{9780000000000 + number % books}"} for number in range(borrows)])
+    rows = []
+    for number in range(borrows):
+        borrow_date = today - timedelta(days=rnd.randrange(60))
+        return_date = borrow_date + timedelta(days=rnd.randrange(30))
+        returned = rnd.random() >= open_share and return_date <= today
+        rows.append({
+            "patron_id": f"{rnd.randrange(patrons):010d}",
+            "copy_id": number + 1,
+            "borrow_date": borrow_date,
+            "due_date": borrow_date + timedelta(days=14),
+            "return_date": return_date if returned else None
+        })
+        if len(rows) >= 50000:
+            connection.execute(insert(Borrows), rows)
+            rows = []
+    if rows:
+        connection.execute(insert(Borrows), rows)
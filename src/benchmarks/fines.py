@@ -0,0 +1,48 @@
+from benchmarks.common import database_url, timed, report, seed
+from datetime import date, timedelta
+from sqlmodel import Session, SQLModel, select
+from models import Patron, Borrows, JobWatermark
+import argparse
+import crud
+import database
+import migrations
+
+# one day of fines: the original per-loan ORM loop against calculate_patron_fines
+
+
+def legacy_calculate_patron_fines(session: Session, today: date):
+    operation = select(Borrows).where(Borrows.due_date < today).where(Borrows.return_date == None)
+    overdue_books = session.exec(operation).all()
+    for book in overdue_books:
+        patron = session.exec(select(Patron).where(Patron.id == book.patron_id)).one()
+        patron.fine += 1
+        session.add(patron)
+    session.commit()
+    return len(overdue_books)
+
+def main():
+    parser = argparse.ArgumentParser(description="fine calculation benchmark")
+    parser.add_argument("--patrons", type=int, default=20000)
+    parser.add_argument("--borrows", type=int, default=1000000)
+    args = parser.parse_args()
+    today = date.today()
+
+    legacy = database.create_db_engine(database_url("legacy.db"))
+    SQLModel.metadata.create_all(legacy)
+    with legacy.begin() as connection:
+        seed(connection, args.patrons, args.borrows, today)
+    with Session(legacy) as session:
+        seconds, loans = timed(legacy_calculate_patron_fines, session, today)
+    report(f"per-loan ORM loop ({loans} overdue loans)", seconds, loans)
+
+    migrations.upgrade(database.engine)
+    with database.engine.begin() as connection:
+        seed(connection, args.patrons, args.borrows, today)
+    with Session(database.engine) as session:
+        session.get(JobWatermark, crud.FINE_JOB).last_run_date = today - timedelta(days=1)
+        session.commit()
+        seconds, metrics = timed(crud.calculate_patron_fines, session, today)
+    report(f"calculate_patron_fines ({metrics['loans_fined']} loans fined)", seconds, metrics["loans_fined"])
+
+if __name__ == "__main__":
+    main()
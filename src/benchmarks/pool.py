@@ -0,0 +1,62 @@
+from benchmarks.common import database_url, timed, report, seed
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlmodel import Session, SQLModel, select
+from sqlalchemy import create_engine, update, event
+from models import Patron
+import argparse
+import database
+import os
+import random
+
+# compare the stock engine (rollback journal, default 5 + 10 pool) with create_db_engine under concurrent readers and writers
+
+
+def baseline_engine(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", lambda dbapi_connection, record: dbapi_connection.execute("PRAGMA journal_mode=DELETE"))
+    return engine
+
+def workload(engine, patrons: int, requests: int, write_share: float, worker: int):
+    rnd = random.Random(worker)
+    for _ in range(requests):
+        with Session(engine) as session:
+            after = f"{rnd.randrange(patrons):010d}"
+            session.exec(select(Patron).where(Patron.id > after).order_by(Patron.id).limit(50)).all()
+            if rnd.random() < write_share:
+                session.execute(
+                    update(Patron)
+                    .where(Patron.id == f"{rnd.randrange(patrons):010d}")
+                    .values(fine=Patron.fine + 1)
+                )
+                session.commit()
+
+def run(engine, threads: int, patrons: int, requests: int, write_share: float):
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [executor.submit(workload, engine, patrons, requests, write_share, worker) for worker in range(threads)]
+        for future in futures:
+            future.result()
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite pool and pragma benchmark")
+    parser.add_argument("--patrons", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--write-share", type=float, default=0.1)
+    parser.add_argument("--pool-sizes", default="5,10,20")
+    args = parser.parse_args()
+
+    engines = {"stock engine, rollback journal, pool 5+10": baseline_engine(database_url("baseline.db"))}
+    for pool_size in args.pool_sizes.split(","):
+        os.environ["DB_POOL_SIZE"] = pool_size
+        engines[f"create_db_engine, WAL pragmas, pool {pool_size}+5"] = database.create_db_engine(database_url(f"tuned_{pool_size}.db"))
+    for label, engine in engines.items():
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            seed(connection, args.patrons, 0, date.today())
+        seconds, _ = timed(run, engine, args.threads, args.patrons, args.requests, args.write_share)
+        report(label, seconds, args.threads * args.requests)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
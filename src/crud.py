@@ -1,27 +1,311 @@
-from database import engine
+from database import engine, is_postgresql
 from datetime import timedelta, datetime, date
 from fastapi import HTTPException, Depends
-from models import PatronStatusEnum, Patron, Publisher, Author, Book, BookCopy, Borrows
-from schemas import CreatePatron, ReadPatron, ReadPatronByFine, UpdatePatron, DeletePatron, CreateBook, ReadBook, ReadBookByTitle, UpdateBook, DeleteBook, CreateAuthor, UpdateAuthor, DeleteAuthor, CreatePublisher, UpdatePublisher, DeletePublisher, AddBorrow, ReturnBorrow
+from models import PatronStatusEnum, CopyStatusEnum, Patron, Publisher, Author, Book, BookCopy, Borrows, FineAccrual, JobWatermark, LibraryCounter, NameTrigram
+from schemas import CreatePatron, ReadPatron, ReadPatronByFine, UpdatePatron, DeletePatron, CreateBook, ReadBook, ReadBookByTitle, ReadBookAvailability, ImportBook, UpdateBook, DeleteBook, CreateAuthor, UpdateAuthor, DeleteAuthor, CreatePublisher, UpdatePublisher, DeletePublisher, AddBorrow, AddBorrowBatch, ReturnBorrow, ReturnBorrowBatch
 from sqlmodel import Session, select, func, join
+from sqlalchemy import insert, update, delete, table, column, literal, literal_column, case, cast, or_, bindparam, tuple_, Date, Integer
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from exceptions import NotFoundException, InvalidRequestException, DuplicateEntryException, DBIntegrityError
 from sqlalchemy.exc import IntegrityError, DatabaseError
 from exconstants import *
+from pydantic import ValidationError
+import pyarrow as pa
+import pyarrow.parquet as pq
+import typeahead
+import csv
+import io
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+
+COUNTER_SLOTS = max(int(os.getenv("COUNTER_SLOTS", "8")), 1)
+FINE_JOB = "calculate_patron_fines"
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "10"))
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "snappy")
+NAME_SIMILARITY_THRESHOLD = float(os.getenv("NAME_SIMILARITY_THRESHOLD", "0.3"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+FINE_BATCH_SIZE = int(os.getenv("FINE_BATCH_SIZE", "10000"))
+
+book_search = table("book_search", column("rowid"), column("rank"), column("isbn"), column("document"))
+
+stats_cache = {"expires_at": 0.0, "stats": None}
 
 
 def get_session():
-    return Session(engine)
+    with Session(engine) as session:
+        yield session
+
+# bulk helpers
+def dialect_insert(session: Session, model):
+    if is_postgresql(session.get_bind()):
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+def bulk_insert(session: Session, model, rows: list[dict]):
+    if rows:
+        session.execute(insert(model.__table__), rows)
+
+# one json_each statement: a single bind to process, and one FTS5 trigger flush on SQLite
+def bulk_insert_json(session: Session, model, rows: list[dict]):
+    if not rows or is_postgresql(session.get_bind()):
+        return bulk_insert(session, model, rows)
+    names = list(rows[0])
+    source = func.json_each(json.dumps(rows)).table_valued("value")
+    session.execute(
+        insert(model.__table__)
+        .from_select(names, select(*[func.json_extract(source.c.value, f"$.{name}") for name in names]))
+    )
+
+def upsert(session: Session, model, rows: list[dict], index_elements: list[str], update_columns: list[str] | None = None):
+    if not rows:
+        return
+    operation = dialect_insert(session, model)
+    if update_columns:
+        operation = operation.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: operation.excluded[column] for column in update_columns}
+        )
+    else:
+        operation = operation.on_conflict_do_nothing(index_elements=index_elements)
+    session.execute(operation, rows)
+
+# fuzzy name helpers
+NAME_SEARCHES = {
+    "patron": (Patron, Patron.id, (Patron.first_name, Patron.last_name)),
+    "author": (Author, Author.id, (Author.first_name, Author.midname_initial, Author.last_name)),
+}
+
+def name_expression(columns):
+    expression = columns[0]
+    for name_column in columns[1:]:
+        expression = expression.op("||")(literal_column("' '")).op("||")(name_column)
+    return expression
+
+def name_trigrams(name: str):
+    trigrams = set()
+    for word in re.findall(r"[^\W_]+", name.lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[start:start + 3] for start in range(len(padded) - 2))
+    return trigrams
+
+def trigram_similarity(left: set, right: set):
+    shared = len(left & right)
+    if not shared:
+        return 0.0
+    return shared / (len(left) + len(right) - shared)
+
+def index_name_trigrams(session: Session, kind: str, owner_id, name: str):
+    bulk_index_name_trigrams(session, kind, {owner_id: name})
+
+def bulk_index_name_trigrams(session: Session, kind: str, names: dict):
+    if is_postgresql(session.get_bind()) or not names:
+        return
+    unindex_name_trigrams(session, kind, names.keys())
+    bulk_insert_json(session, NameTrigram, [
+        {"kind": kind, "trigram": trigram, "owner_id": str(owner_id)}
+        for owner_id, name in names.items()
+        for trigram in name_trigrams(name)
+    ])
+
+def unindex_name_trigrams(session: Session, kind: str, owner_ids):
+    if is_postgresql(session.get_bind()):
+        return
+    session.execute(delete(NameTrigram).where(NameTrigram.kind == kind).where(NameTrigram.owner_id.in_([str(owner_id) for owner_id in owner_ids])))
+
+def search_names(session: Session, kind: str, q: str, limit: int):
+    model, key, columns = NAME_SEARCHES[kind]
+    query_trigrams = name_trigrams(q)
+    if not query_trigrams:
+        raise InvalidRequestException(detail=SEARCH_QUERY_INVALID)
+    if is_postgresql(session.get_bind()):
+        name = name_expression(columns)
+        similarity = func.similarity(name, q)
+        rows = session.execute(
+            select(model, similarity)
+            .where(name.op("%")(q))
+            .where(similarity >= NAME_SIMILARITY_THRESHOLD)
+            .order_by(similarity.desc(), key)
+            .limit(limit)
+        ).all()
+        return [{**entity.model_dump(), "similarity": round(score, 3)} for entity, score in rows]
+    frequencies = dict(session.execute(
+        select(NameTrigram.trigram, func.count())
+        .where(NameTrigram.kind == kind)
+        .where(NameTrigram.trigram.in_(query_trigrams))
+        .group_by(NameTrigram.trigram)
+    ).all())
+    required = math.ceil(NAME_SIMILARITY_THRESHOLD * len(query_trigrams))
+    probes = len(query_trigrams) - required + 1 - (len(query_trigrams) - len(frequencies))
+    if probes <= 0:
+        return []
+    # a name at the threshold shares at least `required` query trigrams, so it holds one of the probes;
+    # every such owner is re-scored, the probes only keep the candidate scan off the common postings
+    probed = (
+        select(NameTrigram.owner_id)
+        .where(NameTrigram.kind == kind)
+        .where(NameTrigram.trigram.in_(sorted(frequencies, key=frequencies.get)[:probes]))
+        .distinct()
+        .subquery()
+    )
+    owner_ids = (
+        select(cast(probed.c.owner_id, key.type))
+        .join(NameTrigram, (NameTrigram.owner_id == probed.c.owner_id) & (NameTrigram.kind == kind))
+        .where(NameTrigram.trigram.in_(query_trigrams))
+        .group_by(probed.c.owner_id)
+        .having(func.count() >= required)
+    )
+    candidates = session.exec(select(model).where(key.in_(owner_ids))).all()
+    ranked = []
+    for entity in candidates:
+        score = trigram_similarity(query_trigrams, name_trigrams(" ".join(getattr(entity, name_column.key) for name_column in columns)))
+        if score >= NAME_SIMILARITY_THRESHOLD:
+            ranked.append((score, entity))
+    ranked.sort(key=lambda match: -match[0])
+    return [{**entity.model_dump(), "similarity": round(score, 3)} for score, entity in ranked[:limit]]
+
+# pagination helpers
+def keyset_query(operation, key, limit: int, after=None):
+    if after is not None:
+        operation = operation.where(key > after)
+    return operation.order_by(key).limit(limit + 1)
+
+def keyset_page(items: list, limit: int, cursor):
+    return {
+        "items": items[:limit],
+        "next_cursor": cursor(items[limit - 1]) if len(items) > limit else None
+    }
+
+# counter helpers
+COUNTER_QUERIES = {
+    "patrons": select(func.count(Patron.id)),
+    "authors": select(func.count(Author.id)),
+    "publishers": select(func.count(Publisher.id)),
+    "books": select(func.count(Book.isbn)),
+    "bookcopies": select(func.count(BookCopy.id)),
+    "transactions": select(func.count(Borrows.id)),
+    "unreturned_bookcopies": select(func.count(Borrows.id)).where(Borrows.return_date == None),
+    "fine_total": select(func.coalesce(func.sum(FineAccrual.amount), 0)),
+}
+
+# each bump lands on one random slot so concurrent writers rarely share a row; reads sum the slots
+def bump_counters(session: Session, **deltas: int):
+    slot = random.randrange(COUNTER_SLOTS)
+    rows = [{"name": name, "slot": slot, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    operation = dialect_insert(session, LibraryCounter)
+    session.execute(operation.values(rows).on_conflict_do_update(
+        index_elements=["name", "slot"],
+        set_={"value": LibraryCounter.__table__.c.value + operation.excluded.value}
+    ))
+
+def read_counters(session: Session, *names: str):
+    values = dict(session.exec(
+        select(LibraryCounter.name, func.sum(LibraryCounter.value))
+        .where(LibraryCounter.name.in_(names))
+        .group_by(LibraryCounter.name)
+    ).all())
+    return {name: values.get(name, 0) for name in names}
+
+def read_counter(session: Session, name: str):
+    return read_counters(session, name)[name]
+
+def adjust_open_loans(session: Session, deltas: dict[str, int]):
+    if not deltas:
+        return
+    patrons = Patron.__table__
+    open_loans = patrons.c.open_loans + bindparam("delta")
+    status = case(
+        (open_loans > 0, cast(PatronStatusEnum.ACTIVE, patrons.c.status.type)),
+        else_=cast(PatronStatusEnum.INACTIVE, patrons.c.status.type)
+    )
+    return session.execute(
+        update(patrons)
+        .where(patrons.c.id == bindparam("patron_key"))
+        .values(open_loans=open_loans, status=status),
+        [{"patron_key": patron_id, "delta": delta} for patron_id, delta in deltas.items()]
+    )
+
+def is_unique_violation(error: IntegrityError):
+    return getattr(error.orig, "sqlstate", None) == "23505" or "UNIQUE constraint failed" in str(error.orig)
+
+# open-borrow lookups; the return_date IS NULL predicate is what lets them use the partial indexes
+def open_borrow_for_copy(copy_id, *columns):
+    return select(*columns or [Borrows.id]).where(Borrows.copy_id == copy_id).where(Borrows.return_date == None)
+
+def open_borrows_for_copies(copy_ids, *columns):
+    return select(*columns or [Borrows.id]).where(Borrows.copy_id.in_(copy_ids)).where(Borrows.return_date == None)
+
+def open_borrows_for_patron(patron_id, *columns):
+    return select(*columns or [Borrows.id]).where(Borrows.patron_id == patron_id).where(Borrows.return_date == None)
+
+def catalog_copy_ids(isbns):
+    return select(BookCopy.id).where(BookCopy.isbn.in_(isbns))
+
+def catalog_open_loans_query(isbns):
+    return open_borrows_for_copies(catalog_copy_ids(isbns), Borrows.patron_id, func.count(Borrows.id)).group_by(Borrows.patron_id)
+
+def link_current_borrows(copy_ids):
+    return (
+        update(BookCopy)
+        .where(BookCopy.id.in_(copy_ids))
+        .values(current_borrow_id=open_borrow_for_copy(BookCopy.id).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+
+def catalog_deletion_deltas(session: Session, isbns):
+    copy_ids = catalog_copy_ids(isbns)
+    books, bookcopies, transactions, unreturned_bookcopies = session.execute(select(
+        select(func.count(Book.isbn)).where(Book.isbn.in_(isbns)).scalar_subquery(),
+        select(func.count(BookCopy.id)).where(BookCopy.isbn.in_(isbns)).scalar_subquery(),
+        select(func.count(Borrows.id)).where(Borrows.copy_id.in_(copy_ids)).scalar_subquery(),
+        open_borrows_for_copies(copy_ids, func.count(Borrows.id)).scalar_subquery()
+    )).one()
+    return {
+        "books": -books,
+        "bookcopies": -bookcopies,
+        "transactions": -transactions,
+        "unreturned_bookcopies": -unreturned_bookcopies
+    }
+
+def release_catalog_loans(session: Session, isbns):
+    open_loans = session.execute(catalog_open_loans_query(isbns)).all()
+    adjust_open_loans(session, {patron_id: -count for patron_id, count in open_loans})
+
+def reconcile_library_counters(session: Session):
+    try:
+        counters = {name: session.execute(operation).scalar() or 0 for name, operation in COUNTER_QUERIES.items()}
+        session.execute(delete(LibraryCounter).where(LibraryCounter.name.in_(counters)))
+        bulk_insert(session, LibraryCounter, [{"name": name, "slot": 0, "value": value} for name, value in counters.items()])
+        session.commit()
+        return counters
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
+def ensure_library_counters(session: Session):
+    existing = session.exec(select(func.count(LibraryCounter.name)).where(LibraryCounter.slot == 0)).one()
+    if existing < len(COUNTER_QUERIES):
+        return reconcile_library_counters(session)
 
 # Patron CRUD
-def get_all_patrons(session: Session = Depends(get_session)):
+def get_all_patrons(session: Session = Depends(get_session), limit: int = PAGE_SIZE, after: str | None = None):
     try:
-        operation = select(Patron)
+        operation = keyset_query(select(Patron), Patron.id, limit, after)
         patrons = session.exec(operation).all()
-        if not patrons:
-            return {
-                "message": "No patrons added yet."
-            }
-        return patrons
+        return keyset_page(patrons, limit, lambda patron: patron.id)
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
@@ -49,6 +333,8 @@ def create_patron(body: CreatePatron, session: Session = Depends(get_session)):
             status = PatronStatusEnum.INACTIVE
         )
         session.add(patron)
+        index_name_trigrams(session, "patron", patron.id, f"{patron.first_name} {patron.last_name}")
+        bump_counters(session, patrons=1)
         session.commit()
         session.refresh(patron)
         return patron
@@ -59,6 +345,72 @@ def create_patron(body: CreatePatron, session: Session = Depends(get_session)):
         session.rollback()
         raise DatabaseError
 
+def enroll_patron_chunk(session: Session, chunk: list[tuple[int, CreatePatron]], seen: dict, report: dict):
+    ids = {row.patron_id for _, row in chunk}
+    emails = {row.patron_email for _, row in chunk}
+    phones = {row.patron_phone for _, row in chunk}
+    for patron_id, email, phone in session.execute(
+        select(Patron.id, Patron.email, Patron.phone)
+        .where(or_(Patron.id.in_(ids), Patron.email.in_(emails), Patron.phone.in_(phones)))
+    ):
+        seen["id"].add(patron_id)
+        seen["email"].add(email)
+        seen["phone"].add(phone)
+    accepted = []
+    for line_number, row in chunk:
+        if row.patron_id in seen["id"]:
+            error = DUPLICATE_PATRON_ID
+        elif row.patron_email in seen["email"]:
+            error = DUPLICATE_PATRON_EMAIL
+        elif row.patron_phone in seen["phone"]:
+            error = DUPLICATE_PATRON_PHONE
+        else:
+            seen["id"].add(row.patron_id)
+            seen["email"].add(row.patron_email)
+            seen["phone"].add(row.patron_phone)
+            accepted.append((line_number, row))
+            continue
+        report["rejected"].append({"line": line_number, "patron_id": row.patron_id, "error": error})
+    if not accepted:
+        return
+    try:
+        bulk_insert(session, Patron, [{
+            "id": row.patron_id,
+            "first_name": row.patron_first_name,
+            "last_name": row.patron_last_name,
+            "email": row.patron_email,
+            "phone": row.patron_phone
+        } for _, row in accepted])
+        bulk_index_name_trigrams(session, "patron", {row.patron_id: f"{row.patron_first_name} {row.patron_last_name}" for _, row in accepted})
+        bump_counters(session, patrons=len(accepted))
+        session.commit()
+    except (IntegrityError, DatabaseError) as e:
+        session.rollback()
+        logging.warning(f"Patron enrollment chunk starting at line {chunk[0][0]} failed: {e}")
+        report["rejected"].extend({"line": line_number, "patron_id": row.patron_id, "error": PATRON_ENROLLMENT_FAILED} for line_number, row in accepted)
+        return
+    report["accepted"] += len(accepted)
+
+def enroll_patrons(stream, session: Session):
+    report = {"accepted": 0, "rejected": []}
+    seen = {"id": set(), "email": set(), "phone": set()}
+    chunk = []
+    try:
+        for line_number, row in import_rows(stream, "csv"):
+            try:
+                chunk.append((line_number, CreatePatron.model_validate(row)))
+            except ValidationError as e:
+                report["rejected"].append({"line": line_number, "patron_id": row.get("patron_id"), "error": validation_message(e)})
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                enroll_patron_chunk(session, chunk, seen, report)
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        report["rejected"].append({"line": None, "patron_id": None, "error": f"{IMPORT_FILE_UNREADABLE}: {e}"})
+    if chunk:
+        enroll_patron_chunk(session, chunk, seen, report)
+    report["rejected"].sort(key=lambda rejected: rejected["line"] or 0)
+    return report
+
 def get_patron_by_id(body: ReadPatron, session: Session = Depends(get_session)):
     try:
         operation = select(Patron).where(Patron.id == body.patron_id)
@@ -107,6 +459,16 @@ def get_patron_by_fine(body: ReadPatronByFine, session: Session = Depends(get_se
         session.rollback()
         raise DatabaseError
 
+def search_patrons(session: Session, q: str, limit: int = PAGE_SIZE):
+    try:
+        return search_names(session, "patron", q, limit)
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
 def update_patron(body: UpdatePatron, patron_id: str, session: Session = Depends(get_session)):
     try:
         operation = select(Patron).where(Patron.id == patron_id)
@@ -122,6 +484,7 @@ def update_patron(body: UpdatePatron, patron_id: str, session: Session = Depends
         if body.patron_phone is not None:
             patron.phone = body.patron_phone
         session.add(patron)
+        index_name_trigrams(session, "patron", patron.id, f"{patron.first_name} {patron.last_name}")
         session.commit()
         session.refresh(patron)  
         return patron      
@@ -138,7 +501,20 @@ def delete_patron(patron_id: str, session: Session = Depends(get_session)):
         patron = session.exec(operation).one_or_none()
         if not patron:
             raise NotFoundException(detail=PATRON_NOT_FOUND)
+        transactions, unreturned_bookcopies, fine_total = session.execute(select(
+            select(func.count(Borrows.id)).where(Borrows.patron_id == patron_id).scalar_subquery(),
+            open_borrows_for_patron(patron_id, func.count(Borrows.id)).scalar_subquery(),
+            select(func.coalesce(func.sum(FineAccrual.amount), 0)).where(FineAccrual.patron_id == patron_id).scalar_subquery()
+        )).one()
+        session.execute(
+            update(BookCopy)
+            .where(BookCopy.current_borrow_id.in_(open_borrows_for_patron(patron_id)))
+            .values(status=CopyStatusEnum.AVAILABLE, current_borrow_id=None)
+            .execution_options(synchronize_session=False)
+        )
         session.delete(patron)   
+        unindex_name_trigrams(session, "patron", [patron_id])
+        bump_counters(session, patrons=-1, transactions=-transactions, unreturned_bookcopies=-unreturned_bookcopies, fine_total=-fine_total)
         session.commit()
         return {
             "message": "Patron deleted successfully"
@@ -151,15 +527,11 @@ def delete_patron(patron_id: str, session: Session = Depends(get_session)):
         raise DatabaseError
 
 # Book CRUD
-def get_all_books(session: Session = Depends(get_session)):
+def get_all_books(session: Session = Depends(get_session), limit: int = PAGE_SIZE, after: str | None = None):
     try:
-        operation = select(Book)
+        operation = keyset_query(select(Book), Book.isbn, limit, after)
         books = session.exec(operation).all()
-        if not books:
-            return {
-                "message": "No books added yet."
-            }
-        return books
+        return keyset_page(books, limit, lambda book: book.isbn)
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
@@ -182,10 +554,11 @@ def create_book(body: CreateBook, session: Session = Depends(get_session)):
             qty = body.qty
         )
         session.add(book)
-        book_copies = [BookCopy(isbn=body.isbn) for _ in range(body.qty)]
-        session.bulk_save_objects(book_copies)
+        bulk_insert(session, BookCopy, [{"isbn": body.isbn} for _ in range(body.qty)])
+        bump_counters(session, books=1, bookcopies=body.qty)
         session.commit()
         session.refresh(book)
+        typeahead.index_book(book)
         return book
     except IntegrityError as e:
         session.rollback()
@@ -194,6 +567,146 @@ def create_book(body: CreateBook, session: Session = Depends(get_session)):
         session.rollback()
         raise DatabaseError
 
+# file imports
+def import_rows(stream, format: str):
+    if format == "csv":
+        reader = csv.DictReader(stream, restval="")
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, line.strip()
+
+def validation_message(error: ValidationError):
+    return "; ".join(f"{detail['loc'][0]}: {detail['msg']}" if detail["loc"] else detail["msg"] for detail in error.errors())
+
+def resolve_import_authors(session: Session, rows: list[ImportBook], authors: dict):
+    keys = {(row.author_first_name, row.author_initial_midname, row.author_last_name) for row in rows} - authors.keys()
+    if not keys:
+        return {}, []
+    name = tuple_(Author.first_name, Author.midname_initial, Author.last_name)
+    found = {}
+    for author_id, *key in session.execute(select(Author.id, Author.first_name, Author.midname_initial, Author.last_name).where(name.in_(keys)).order_by(Author.id.desc())):
+        found[tuple(key)] = author_id
+    missing = [key for key in keys if key not in found]
+    created = []
+    if missing:
+        author_ids = session.execute(
+            insert(Author).returning(Author.id, sort_by_parameter_order=True),
+            [{"first_name": first_name, "midname_initial": midname_initial, "last_name": last_name} for first_name, midname_initial, last_name in missing]
+        ).scalars().all()
+        for author_id, (first_name, midname_initial, last_name) in zip(author_ids, missing):
+            found[(first_name, midname_initial, last_name)] = author_id
+            created.append(Author(id=author_id, first_name=first_name, midname_initial=midname_initial, last_name=last_name))
+    return found, created
+
+def resolve_import_publishers(session: Session, rows: list[ImportBook], publishers: dict):
+    names = {row.publisher_name for row in rows} - publishers.keys()
+    if not names:
+        return {}, []
+    found = dict(session.execute(select(Publisher.name, Publisher.id).where(Publisher.name.in_(names)).order_by(Publisher.id.desc())).all())
+    missing = [name for name in names if name not in found]
+    created = []
+    if missing:
+        publisher_ids = session.execute(
+            insert(Publisher).returning(Publisher.id, sort_by_parameter_order=True),
+            [{"name": name} for name in missing]
+        ).scalars().all()
+        for publisher_id, name in zip(publisher_ids, missing):
+            found[name] = publisher_id
+            created.append(Publisher(id=publisher_id, name=name))
+    return found, created
+
+def import_book_chunk(session: Session, chunk: list[tuple[int, ImportBook]], authors: dict, publishers: dict, report: dict):
+    rows = [row for _, row in chunk]
+    try:
+        found_authors, created_authors = resolve_import_authors(session, rows, authors)
+        found_publishers, created_publishers = resolve_import_publishers(session, rows, publishers)
+        existing = set(session.exec(select(Book.isbn).where(Book.isbn.in_({row.isbn for row in rows}))).all())
+        books = {}
+        copies = {}
+        for row in rows:
+            copies[row.isbn] = copies.get(row.isbn, 0) + row.qty
+            if row.isbn in existing or row.isbn in books:
+                continue
+            author_key = (row.author_first_name, row.author_initial_midname, row.author_last_name)
+            books[row.isbn] = {
+                "isbn": row.isbn,
+                "title": row.title,
+                "genre": row.genre,
+                "author_id": found_authors.get(author_key) or authors[author_key],
+                "publisher_id": found_publishers.get(row.publisher_name) or publishers[row.publisher_name],
+                "published_year": row.published_year
+            }
+        for isbn, book in books.items():
+            book["qty"] = copies[isbn]
+        bulk_insert_json(session, Book, list(books.values()))
+        restocked = [{"book_isbn": isbn, "added": qty} for isbn, qty in copies.items() if isbn not in books]
+        if restocked:
+            books_table = Book.__table__
+            session.execute(
+                update(books_table)
+                .where(books_table.c.isbn == bindparam("book_isbn"))
+                .values(qty=books_table.c.qty + bindparam("added")),
+                restocked
+            )
+        bulk_insert_json(session, BookCopy, [{"isbn": isbn} for isbn, qty in copies.items() for _ in range(qty)])
+        bulk_index_name_trigrams(session, "author", {author.id: typeahead.author_label(author) for author in created_authors})
+        bump_counters(session, books=len(books), bookcopies=sum(copies.values()), authors=len(created_authors), publishers=len(created_publishers))
+        session.commit()
+    except (IntegrityError, DatabaseError) as e:
+        session.rollback()
+        logging.warning(f"Book import chunk starting at line {chunk[0][0]} failed: {e}")
+        report["rejected"].extend({"line": line_number, "isbn": row.isbn, "error": BOOK_IMPORT_FAILED} for line_number, row in chunk)
+        return
+    authors.update(found_authors)
+    publishers.update(found_publishers)
+    for author in created_authors:
+        typeahead.index_author(author)
+    for publisher in created_publishers:
+        typeahead.index_publisher(publisher)
+    typeahead.index_books(books.values())
+    report["imported"] += len(chunk)
+    report["books_created"] += len(books)
+    report["books_restocked"] += len(restocked)
+    report["copies_added"] += sum(copies.values())
+    report["authors_created"] += len(created_authors)
+    report["publishers_created"] += len(created_publishers)
+
+def import_books(stream, format: str, session: Session):
+    report = {
+        "imported": 0,
+        "books_created": 0,
+        "books_restocked": 0,
+        "copies_added": 0,
+        "authors_created": 0,
+        "publishers_created": 0,
+        "rejected": []
+    }
+    authors = {}
+    publishers = {}
+    chunk = []
+    try:
+        for line_number, row in import_rows(stream, format):
+            try:
+                chunk.append((line_number, ImportBook.model_validate(row)))
+            except ValidationError as e:
+                report["rejected"].append({"line": line_number, "isbn": row.get("isbn") if isinstance(row, dict) else None, "error": validation_message(e)})
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                import_book_chunk(session, chunk, authors, publishers, report)
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        report["rejected"].append({"line": None, "isbn": None, "error": f"{IMPORT_FILE_UNREADABLE}: {e}"})
+    if chunk:
+        import_book_chunk(session, chunk, authors, publishers, report)
+    report["rejected"].sort(key=lambda rejected: rejected["line"] or 0)
+    return report
+
 def get_book_by_isbn(body: ReadBook, session: Session = Depends(get_session)):
     try:
         operation = select(Book).where(Book.isbn == body.isbn)
@@ -262,6 +775,113 @@ def get_book_by_publisher(publisher_name: str, session: Session):
         session.rollback()
         raise DatabaseError
 
+def search_terms(q: str):
+    terms = re.findall(r"[^\W_]+", q.lower())
+    if not terms:
+        raise InvalidRequestException(detail=SEARCH_QUERY_INVALID)
+    return terms
+
+def book_search_query(session: Session, q: str):
+    terms = search_terms(q)
+    if is_postgresql(session.get_bind()):
+        query = func.to_tsquery("simple", " & ".join(terms) + ":*")
+        return (
+            select(Book)
+            .join(book_search, book_search.c.isbn == Book.isbn)
+            .where(book_search.c.document.op("@@")(query))
+            .order_by(func.ts_rank_cd(book_search.c.document, query).desc(), Book.isbn)
+        )
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    return (
+        select(Book)
+        .join(book_search, book_search.c.rowid == literal_column("book.rowid"))
+        .where(literal_column("book_search").op("MATCH")(match))
+        .order_by(book_search.c.rank)
+    )
+
+def book_filters(operation, genre: str | None = None, author_id: int | None = None, publisher_id: int | None = None, year_from: int | None = None, year_to: int | None = None, available: bool | None = None):
+    if genre is not None:
+        operation = operation.where(Book.genre == genre)
+    if author_id is not None:
+        operation = operation.where(Book.author_id == author_id)
+    if publisher_id is not None:
+        operation = operation.where(Book.publisher_id == publisher_id)
+    if year_from is not None:
+        operation = operation.where(Book.published_year >= year_from)
+    if year_to is not None:
+        operation = operation.where(Book.published_year <= year_to)
+    if available is not None:
+        has_available_copy = select(BookCopy.id).where(BookCopy.isbn == Book.isbn).where(copy_is_available()).exists()
+        operation = operation.where(has_available_copy if available else ~has_available_copy)
+    return operation
+
+def search_offset(after: str | None):
+    if after is None:
+        return 0
+    if not after.isdigit():
+        raise InvalidRequestException(detail=SEARCH_CURSOR_INVALID)
+    return int(after)
+
+def search_books(session: Session, q: str | None = None, limit: int = PAGE_SIZE, after: str | None = None, **filters):
+    try:
+        if q is None:
+            operation = keyset_query(book_filters(select(Book), **filters), Book.isbn, limit, after)
+            books = session.exec(operation).all()
+            return keyset_page(books, limit, lambda book: book.isbn)
+        offset = search_offset(after)
+        operation = book_filters(book_search_query(session, q), **filters).limit(limit + 1).offset(offset)
+        books = session.exec(operation).all()
+        return keyset_page(books, limit, lambda book: str(offset + limit))
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
+def book_availability_query(isbns: list[str], today: date):
+    on_loan = BookCopy.status == CopyStatusEnum.ON_LOAN
+    return (
+        select(
+            BookCopy.isbn,
+            func.count(BookCopy.id),
+            func.coalesce(func.sum(case((on_loan, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((on_loan & (Borrows.due_date < today), 1), else_=0)), 0)
+        )
+        .outerjoin(Borrows, Borrows.id == BookCopy.current_borrow_id)
+        .where(BookCopy.isbn.in_(isbns))
+        .group_by(BookCopy.isbn)
+    )
+
+def book_availability(session: Session, isbns: list[str]):
+    counts = {isbn: {"total": 0, "on_loan": 0, "overdue": 0, "available": 0} for isbn in isbns}
+    for isbn, total, on_loan, overdue in session.execute(book_availability_query(isbns, date.today())):
+        counts[isbn] = {"total": total, "on_loan": on_loan, "overdue": overdue, "available": total - on_loan}
+    return counts
+
+def get_book_availability(isbn: ReadBook, session: Session = Depends(get_session)):
+    try:
+        book = session.exec(select(Book.isbn).where(Book.isbn == isbn.isbn)).one_or_none()
+        if not book:
+            raise NotFoundException(detail=BOOK_NOT_FOUND)
+        return {"isbn": isbn.isbn, **book_availability(session, [isbn.isbn])[isbn.isbn]}
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
+def get_books_availability(body: ReadBookAvailability, session: Session = Depends(get_session)):
+    try:
+        return book_availability(session, body.isbns)
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
 def get_book_by_genre(genre: str, session: Session):
     try:
         operation = select(Book).where(
@@ -294,6 +914,7 @@ def update_book(body: UpdateBook, isbn: ReadBook, session: Session = Depends(get
         session.add(book)
         session.commit()
         session.refresh(book)
+        typeahead.index_book(book)
         return book
     except IntegrityError as e:
         session.rollback()
@@ -308,8 +929,12 @@ def delete_book(isbn: str, session: Session = Depends(get_session)):
         book = session.exec(operation).one_or_none()
         if not book:
             raise NotFoundException(detail=BOOK_NOT_FOUND)
+        deltas = catalog_deletion_deltas(session, [isbn])
+        release_catalog_loans(session, [isbn])
         session.delete(book)   
+        bump_counters(session, **deltas)
         session.commit()
+        typeahead.unindex("titles", isbn)
         return {
             "message": "Book deleted successfully"
         }
@@ -321,13 +946,11 @@ def delete_book(isbn: str, session: Session = Depends(get_session)):
         raise DatabaseError
 
 # Author CRUD
-def get_all_authors(session: Session = Depends(get_session)):
+def get_all_authors(session: Session = Depends(get_session), limit: int = PAGE_SIZE, after: int | None = None):
     try:
-        operation = select(Author)
+        operation = keyset_query(select(Author), Author.id, limit, after)
         authors = session.exec(operation).all()
-        if not authors:
-            return []
-        return authors
+        return keyset_page(authors, limit, lambda author: author.id)
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
@@ -346,8 +969,12 @@ def create_author(body: CreateAuthor, session: Session = Depends(get_session)):
             last_name = body.author_last_name
         )
         session.add(author)
+        session.flush()
+        index_name_trigrams(session, "author", author.id, typeahead.author_label(author))
+        bump_counters(session, authors=1)
         session.commit()
         session.refresh(author)
+        typeahead.index_author(author)
         return author
     except IntegrityError as e:
         session.rollback()
@@ -381,6 +1008,16 @@ def get_author_by_name(author_name: str, session: Session):
         session.rollback()
         raise DatabaseError
 
+def search_authors(session: Session, q: str, limit: int = PAGE_SIZE):
+    try:
+        return search_names(session, "author", q, limit)
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
 def update_author(body: UpdateAuthor, author_id: int, session: Session = Depends(get_session)):
     try:
         operation = select(Author).where(Author.id == author_id)
@@ -394,8 +1031,10 @@ def update_author(body: UpdateAuthor, author_id: int, session: Session = Depends
         if body.author_last_name is not None:
             author.last_name = body.author_last_name
         session.add(author)
+        index_name_trigrams(session, "author", author.id, typeahead.author_label(author))
         session.commit()
         session.refresh(author)
+        typeahead.index_author(author)
         return author
     except IntegrityError as e:
         session.rollback()
@@ -410,8 +1049,15 @@ def delete_author(author_id: int, session: Session = Depends(get_session)):
         author = session.exec(operation).one_or_none()
         if not author:
             raise NotFoundException(detail=AUTHOR_NOT_FOUND)   
+        isbns = session.exec(select(Book.isbn).where(Book.author_id == author_id)).all()
+        deltas = catalog_deletion_deltas(session, select(Book.isbn).where(Book.author_id == author_id))
+        release_catalog_loans(session, select(Book.isbn).where(Book.author_id == author_id))
         session.delete(author)   
+        unindex_name_trigrams(session, "author", [author_id])
+        bump_counters(session, authors=-1, **deltas)
         session.commit()
+        typeahead.unindex("authors", author_id)
+        typeahead.unindex("titles", *isbns)
         return {
             "message": "Book deleted successfully"
         }
@@ -423,15 +1069,11 @@ def delete_author(author_id: int, session: Session = Depends(get_session)):
         raise DatabaseError
 
 # Publisher CRUD
-def get_all_publishers(session: Session = Depends(get_session)):
+def get_all_publishers(session: Session = Depends(get_session), limit: int = PAGE_SIZE, after: int | None = None):
     try:
-        operation = select(Publisher)
+        operation = keyset_query(select(Publisher), Publisher.id, limit, after)
         publishers = session.exec(operation).all()
-        if not publishers:
-            return {
-                "message": "No publishers added yet."
-            }
-        return publishers
+        return keyset_page(publishers, limit, lambda publisher: publisher.id)
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
@@ -448,8 +1090,10 @@ def create_publisher(body: CreatePublisher, session: Session = Depends(get_sessi
             name = body.publisher_name
         )
         session.add(publisher)
+        bump_counters(session, publishers=1)
         session.commit()
         session.refresh(publisher)
+        typeahead.index_publisher(publisher)
         return publisher
     except IntegrityError as e:
         session.rollback()
@@ -469,6 +1113,7 @@ def update_publisher(body: UpdatePublisher, publisher_id: int, session: Session
         session.add(publisher)
         session.commit()
         session.refresh(publisher)
+        typeahead.index_publisher(publisher)
         return publisher
     except IntegrityError as e:
         session.rollback()
@@ -498,8 +1143,14 @@ def delete_publisher(publisher_id: int, session: Session = Depends(get_session))
         publisher = session.exec(operation).one_or_none()
         if not publisher:
             raise NotFoundException(detail=PUBLISHER_NOT_FOUND)
+        isbns = session.exec(select(Book.isbn).where(Book.publisher_id == publisher_id)).all()
+        deltas = catalog_deletion_deltas(session, select(Book.isbn).where(Book.publisher_id == publisher_id))
+        release_catalog_loans(session, select(Book.isbn).where(Book.publisher_id == publisher_id))
         session.delete(publisher)   
+        bump_counters(session, publishers=-1, **deltas)
         session.commit()
+        typeahead.unindex("publishers", publisher_id)
+        typeahead.unindex("titles", *isbns)
         return {
             "message": "Publisher deleted successfully"
         }
@@ -510,32 +1161,84 @@ def delete_publisher(publisher_id: int, session: Session = Depends(get_session))
         session.rollback()
         raise DatabaseError
 
+# shared queries
+def join_borrow_details(operation):
+    return (
+        operation
+        .join(BookCopy, Borrows.copy_id == BookCopy.id)
+        .join(Book, BookCopy.isbn == Book.isbn)
+        .join(Author, Book.author_id == Author.id)
+        .join(Publisher, Book.publisher_id == Publisher.id)
+    )
+
+def borrow_details_query():
+    return join_borrow_details(select(Borrows, BookCopy, Book, Author, Publisher))
+
+def borrow_export_query():
+    return join_borrow_details(select(
+        Borrows.id.label("borrow_id"),
+        Borrows.patron_id,
+        Borrows.due_date,
+        Borrows.borrow_date,
+        Borrows.return_date,
+        BookCopy.id.label("copy_id"),
+        Book.isbn,
+        Book.title,
+        (Author.first_name + " " + Author.midname_initial + " " + Author.last_name).label("author"),
+        Publisher.name.label("publisher")
+    ).select_from(Borrows)).order_by(Borrows.id)
+
+def borrow_details(result):
+    return [
+        {
+            "borrow_id": borrow.id,
+            "patron_id": borrow.patron_id,
+            "due_date": borrow.due_date,
+            "borrow_date": borrow.borrow_date,
+            "return_date": borrow.return_date,
+            "copy_id": bookcopy.id,
+            "isbn": book.isbn,
+            "title": book.title,
+            "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
+            "publisher": publisher.name
+        }
+        for borrow, bookcopy, book, author, publisher in result
+    ]
+
+def copy_is_available():
+    return BookCopy.status == CopyStatusEnum.AVAILABLE
+
+def available_bookcopies_query():
+    return (
+        select(BookCopy, Book, Author, Publisher)
+        .join(Book, BookCopy.isbn == Book.isbn)
+        .join(Author, Book.author_id == Author.id)
+        .join(Publisher, Book.publisher_id == Publisher.id)
+        .where(copy_is_available())
+    )
+
+def available_bookcopy_details(result):
+    return [
+        {
+            "id": bookcopy.id,
+            "isbn": bookcopy.isbn,
+            "title": book.title,
+            "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
+            "publisher": publisher.name
+        }
+        for bookcopy, book, author, publisher in result
+    ]
+
+def overdue_bookcopies_query(today: date):
+    return borrow_details_query().where(Borrows.return_date == None).where(Borrows.due_date < today)
+
 # Bookcopy CRUD
 def get_available_bookcopies(session: Session = Depends(get_session)):
     try:
-        borrowed_copies_subquery = select(Borrows.copy_id).where(Borrows.return_date.is_(None)).subquery()
-        operation = (
-            select(BookCopy, Book, Author, Publisher)
-            .join(Book, BookCopy.isbn == Book.isbn)
-            .join(Author, Book.author_id == Author.id)
-            .join(Publisher, Book.publisher_id == Publisher.id)
-            .where(BookCopy.id.not_in(borrowed_copies_subquery))
-        )
-        result = session.exec(operation).all()
+        result = session.exec(available_bookcopies_query()).all()
         if not result:
             return []
-        
-        available_bookcopies = [
-            {
-                "id": bookcopy.id,
-                "isbn": bookcopy.isbn,
-                "title": book.title,
-                "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
-                "publisher": publisher.name
-            }
-            for bookcopy, book, author, publisher in result
-        ]
-        return available_bookcopies
+        return available_bookcopy_details(result)
     except IntegrityError:
         session.rollback()
         raise DBIntegrityError
@@ -545,35 +1248,10 @@ def get_available_bookcopies(session: Session = Depends(get_session)):
 
 def get_overdue_bookcopies(session: Session = Depends(get_session)):
     try:
-        today = date.today()
-        operation = (
-            select(Borrows, BookCopy, Book, Author, Publisher)
-            .join(BookCopy, Borrows.copy_id == BookCopy.id)
-            .join(Book, BookCopy.isbn == Book.isbn)
-            .join(Author, Book.author_id == Author.id)
-            .join(Publisher, Book.publisher_id == Publisher.id)
-            .where(Borrows.due_date < today)
-            .where(Borrows.return_date == None)
-        )
-        result = session.exec(operation).all()
+        result = session.exec(overdue_bookcopies_query(date.today())).all()
         if not result:
             return []
-        overdue_bookcopies = [
-            {
-                "borrow_id": borrow.id,
-                "patron_id": borrow.patron_id,
-                "due_date": borrow.due_date,
-                "borrow_date": borrow.borrow_date,
-                "return_date": borrow.return_date,
-                "copy_id": bookcopy.id,
-                "isbn": book.isbn,
-                "title": book.title,
-                "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
-                "publisher": publisher.name
-            }
-            for borrow, bookcopy, book, author, publisher in result
-        ]
-        return overdue_bookcopies
+        return borrow_details(result)
     except IntegrityError:
         session.rollback()
         raise DBIntegrityError
@@ -582,36 +1260,10 @@ def get_overdue_bookcopies(session: Session = Depends(get_session)):
         raise DatabaseError
 
 # Borrow CRUD
-def get_all_borrows(session: Session = Depends(get_session)):
-    try:
-        operation = (
-            select(Borrows, BookCopy, Book, Author, Publisher)
-            .join(BookCopy, Borrows.copy_id == BookCopy.id)
-            .join(Book, BookCopy.isbn == Book.isbn)
-            .join(Author, Book.author_id == Author.id)
-            .join(Publisher, Book.publisher_id == Publisher.id)
-        )
-        result = session.exec(operation).all()
-        if not result:
-            return {
-                "message": "No borrows transacted yet."
-            }
-        borrows = [
-            {
-                "borrow_id": borrow.id,
-                "patron_id": borrow.patron_id,
-                "due_date": borrow.due_date,
-                "borrow_date": borrow.borrow_date,
-                "return_date": borrow.return_date,
-                "copy_id": bookcopy.id,
-                "isbn": book.isbn,
-                "title": book.title,
-                "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
-                "publisher": publisher.name
-            }
-            for borrow, bookcopy, book, author, publisher in result
-        ]
-        return borrows
+def get_all_borrows(session: Session = Depends(get_session), limit: int = PAGE_SIZE, after: int | None = None):
+    try:
+        result = session.exec(keyset_query(borrow_details_query(), Borrows.id, limit, after)).all()
+        return keyset_page(borrow_details(result), limit, lambda borrow: borrow["borrow_id"])
     except IntegrityError:
         session.rollback()
         raise DBIntegrityError
@@ -621,19 +1273,6 @@ def get_all_borrows(session: Session = Depends(get_session)):
 
 def create_borrow(body: AddBorrow, session: Session = Depends(get_session)):
     try:
-        book_copy = session.exec(select(BookCopy).where(BookCopy.id == body.copy_id)).one_or_none()
-        if not book_copy:
-            raise NotFoundException(detail="Book copy not found")
-        
-        book = session.exec(select(Book).where(Book.isbn == book_copy.isbn)).one_or_none()
-        if not book:
-            raise NotFoundException(detail="Associated book not found")
-        existing_borrow = session.exec(select(Borrows).where(Borrows.copy_id == body.copy_id).where(Borrows.return_date == None)).one_or_none()
-        if existing_borrow:
-            raise DuplicateEntryException(detail=DUPLICATE_BORROW)
-        duplicate_borrow = session.exec(select(Borrows).where(Borrows.patron_id == body.patron_id).where(Borrows.copy_id == body.copy_id).where(Borrows.borrow_date == body.borrow_date)).one_or_none()
-        if duplicate_borrow:
-            raise DuplicateEntryException(detail="This book has already been borrowed")
         borrow = Borrows(
             patron_id=body.patron_id,
             copy_id=body.copy_id,
@@ -641,44 +1280,118 @@ def create_borrow(body: AddBorrow, session: Session = Depends(get_session)):
             due_date=body.borrow_date + timedelta(days=15),
             return_date=None
         )
-
-        patron = session.exec(select(Patron).where(Patron.id == body.patron_id)).one_or_none()
-        if not patron:
-            raise NotFoundException(detail="Patron not found")
-        if patron.status != PatronStatusEnum.ACTIVE:
-            patron.status = PatronStatusEnum.ACTIVE
-
         session.add(borrow)
+        session.flush()
+        checked_out = session.execute(
+            update(BookCopy)
+            .where(BookCopy.id == body.copy_id)
+            .values(status=CopyStatusEnum.ON_LOAN, current_borrow_id=borrow.id)
+            .execution_options(synchronize_session=False)
+        )
+        if checked_out.rowcount != 1:
+            session.rollback()
+            raise NotFoundException(detail=BOOKCOPY_NOT_FOUND)
+        if adjust_open_loans(session, {body.patron_id: 1}).rowcount != 1:
+            session.rollback()
+            raise NotFoundException(detail=PATRON_NOT_FOUND)
+        bump_counters(session, transactions=1, unreturned_bookcopies=1)
         session.commit()
         session.refresh(borrow)
         return borrow
 
     except IntegrityError as e:
         session.rollback()
+        if is_unique_violation(e):
+            raise DuplicateEntryException(detail=DUPLICATE_BORROW)
+        if not session.get(BookCopy, body.copy_id):
+            raise NotFoundException(detail=BOOKCOPY_NOT_FOUND)
+        if not session.get(Patron, body.patron_id):
+            raise NotFoundException(detail=PATRON_NOT_FOUND)
         raise DBIntegrityError
     except DatabaseError as e:
         session.rollback()
         raise DatabaseError
 
-def return_borrow(transaction_id: int, body: ReturnBorrow, session: Session = Depends(get_session)):
+def create_borrows(body: AddBorrowBatch, session: Session = Depends(get_session)):
     try:
-        operation = select(Borrows).where(Borrows.id == transaction_id)
-        transaction = session.exec(operation).one_or_none()
-        if not transaction:
-            raise NotFoundException(detail=BORROW_NOT_FOUND)
-        transaction.return_date = body.return_date
-        session.add(transaction)
+        patron = session.exec(select(Patron).where(Patron.id == body.patron_id)).one_or_none()
+        if not patron:
+            raise NotFoundException(detail=PATRON_NOT_FOUND)
+        copy_ids = list(dict.fromkeys(body.copy_ids))
+        claimed = set(session.execute(
+            update(BookCopy)
+            .where(BookCopy.id.in_(copy_ids))
+            .where(BookCopy.status == CopyStatusEnum.AVAILABLE)
+            .values(status=CopyStatusEnum.ON_LOAN)
+            .returning(BookCopy.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all())
+        known_copies = claimed
+        if len(claimed) < len(copy_ids):
+            known_copies = set(session.exec(select(BookCopy.id).where(BookCopy.id.in_(copy_ids))).all())
+        borrow_ids = {}
+        if claimed:
+            due_date = body.borrow_date + timedelta(days=15)
+            inserted = session.execute(
+                insert(Borrows).returning(Borrows.id, Borrows.copy_id, sort_by_parameter_order=True),
+                [{"patron_id": body.patron_id, "copy_id": copy_id, "borrow_date": body.borrow_date, "due_date": due_date, "return_date": None} for copy_id in copy_ids if copy_id in claimed]
+            )
+            borrow_ids = {copy_id: borrow_id for borrow_id, copy_id in inserted}
+            session.execute(link_current_borrows(claimed))
+            adjust_open_loans(session, {body.patron_id: len(claimed)})
+            bump_counters(session, transactions=len(claimed), unreturned_bookcopies=len(claimed))
         session.commit()
-        patron = session.exec(select(Patron).where(Patron.id == transaction.patron_id)).one_or_none()
-        patron_activity = False       
-        for borrow in patron.borrows:
-            if not borrow.return_date:
-                patron_activity = True
-        if patron_activity == False:
-            patron.status = PatronStatusEnum.INACTIVE
-        session.add(patron)
+        results = []
+        for copy_id in copy_ids:
+            if copy_id in borrow_ids:
+                results.append({"copy_id": copy_id, "status": "borrowed", "borrow_id": borrow_ids[copy_id]})
+            elif copy_id in known_copies:
+                results.append({"copy_id": copy_id, "status": "rejected", "detail": DUPLICATE_BORROW})
+            else:
+                results.append({"copy_id": copy_id, "status": "rejected", "detail": BOOKCOPY_NOT_FOUND})
+        return {
+            "patron_id": body.patron_id,
+            "due_date": body.borrow_date + timedelta(days=15),
+            "results": results
+        }
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
+def return_borrow(transaction_id: int, body: ReturnBorrow, session: Session = Depends(get_session)):
+    try:
+        closed = session.execute(
+            update(Borrows)
+            .where(Borrows.id == transaction_id)
+            .where(Borrows.return_date == None)
+            .values(return_date=body.return_date)
+            .returning(Borrows.copy_id, Borrows.patron_id)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if closed:
+            copy_id, patron_id = closed
+            session.execute(
+                update(BookCopy)
+                .where(BookCopy.id == copy_id)
+                .where(BookCopy.current_borrow_id == transaction_id)
+                .values(status=CopyStatusEnum.AVAILABLE, current_borrow_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            adjust_open_loans(session, {patron_id: -1})
+            bump_counters(session, unreturned_bookcopies=-1)
+        else:
+            corrected = session.execute(
+                update(Borrows)
+                .where(Borrows.id == transaction_id)
+                .values(return_date=body.return_date)
+                .execution_options(synchronize_session=False)
+            )
+            if corrected.rowcount != 1:
+                raise NotFoundException(detail=BORROW_NOT_FOUND)
         session.commit()
-        session.refresh(patron)
         return {
             "message": "Borrow returned successfully"
         }
@@ -689,37 +1402,54 @@ def return_borrow(transaction_id: int, body: ReturnBorrow, session: Session = De
         session.rollback()
         raise DatabaseError
 
+def return_borrows(body: ReturnBorrowBatch, session: Session = Depends(get_session)):
+    try:
+        closed = session.execute(
+            update(Borrows)
+            .where(Borrows.return_date == None)
+            .where(or_(Borrows.id.in_(body.transaction_ids), Borrows.copy_id.in_(body.copy_ids)))
+            .values(return_date=body.return_date)
+            .returning(Borrows.id, Borrows.copy_id, Borrows.patron_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if closed:
+            session.execute(
+                update(BookCopy)
+                .where(BookCopy.current_borrow_id.in_([borrow_id for borrow_id, _, _ in closed]))
+                .values(status=CopyStatusEnum.AVAILABLE, current_borrow_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            returned_per_patron = {}
+            for _, _, patron_id in closed:
+                returned_per_patron[patron_id] = returned_per_patron.get(patron_id, 0) - 1
+            adjust_open_loans(session, returned_per_patron)
+            bump_counters(session, unreturned_bookcopies=-len(closed))
+        session.commit()
+        returned_transactions = {borrow_id for borrow_id, _, _ in closed}
+        returned_copies = {copy_id for _, copy_id, _ in closed}
+        return {
+            "returned": [{"transaction_id": borrow_id, "copy_id": copy_id, "patron_id": patron_id} for borrow_id, copy_id, patron_id in closed],
+            "unmatched": {
+                "transaction_ids": [transaction_id for transaction_id in body.transaction_ids if transaction_id not in returned_transactions],
+                "copy_ids": [copy_id for copy_id in body.copy_ids if copy_id not in returned_copies]
+            }
+        }
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
+
 def get_borrows_by_patron(patron_id: str, session: Session = Depends(get_session)):
     try:
-        operation = (
-            select(Borrows, BookCopy, Book, Author, Publisher)
-            .join(BookCopy, Borrows.copy_id == BookCopy.id)
-            .join(Book, BookCopy.isbn == Book.isbn)
-            .join(Author, Book.author_id == Author.id)
-            .join(Publisher, Book.publisher_id == Publisher.id)
-            .where(Borrows.patron_id == patron_id)
-        )
+        operation = borrow_details_query().where(Borrows.patron_id == patron_id)
         result = session.exec(operation).all()
         if not result:
             return {
                 "message": "No borrows found for this patron."
             }
-        borrows = [
-            {
-                "borrow_id": borrow.id,
-                "patron_id": borrow.patron_id,
-                "due_date": borrow.due_date,
-                "borrow_date": borrow.borrow_date,
-                "return_date": borrow.return_date,
-                "copy_id": bookcopy.id,
-                "isbn": book.isbn,
-                "title": book.title,
-                "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
-                "publisher": publisher.name
-            }
-            for borrow, bookcopy, book, author, publisher in result
-        ]
-        return borrows
+        return borrow_details(result)
     except IntegrityError:
         session.rollback()
         raise DBIntegrityError
@@ -729,35 +1459,13 @@ def get_borrows_by_patron(patron_id: str, session: Session = Depends(get_session
 
 def get_borrows_by_isbn(isbn: str, session: Session = Depends(get_session)):
     try:
-        operation = (
-            select(Borrows, BookCopy, Book, Author, Publisher)
-            .join(BookCopy, Borrows.copy_id == BookCopy.id)
-            .join(Book, BookCopy.isbn == Book.isbn)
-            .join(Author, Book.author_id == Author.id)
-            .join(Publisher, Book.publisher_id == Publisher.id)
-            .where(BookCopy.isbn == isbn)
-        )
+        operation = borrow_details_query().where(BookCopy.isbn == isbn)
         result = session.exec(operation).all()
         if not result:
             return {
                 "message": "No borrows found for this ISBN."
             }
-        borrows = [
-            {
-                "borrow_id": borrow.id,
-                "patron_id": borrow.patron_id,
-                "due_date": borrow.due_date,
-                "borrow_date": borrow.borrow_date,
-                "return_date": borrow.return_date,
-                "copy_id": bookcopy.id,
-                "isbn": book.isbn,
-                "title": book.title,
-                "author": f"{author.first_name} {author.midname_initial} {author.last_name}",
-                "publisher": publisher.name
-            }
-            for borrow, bookcopy, book, author, publisher in result
-        ]
-        return borrows
+        return borrow_details(result)
     except IntegrityError:
         session.rollback()
         raise DBIntegrityError
@@ -781,16 +1489,115 @@ def get_due_books(session: Session = Depends(get_session)):
         session.rollback()
         raise DatabaseError
 
-def calculate_patron_fines(session: Session = Depends(get_session)):
+def fine_window(session: Session, since: date, through: date):
+    since, through = literal(since, Date), literal(through, Date)
+    if is_postgresql(session.get_bind()):
+        first_day = func.greatest(Borrows.due_date, since) + 1
+        last_day = func.least(through, Borrows.return_date - 1)
+        return first_day, last_day, last_day - first_day + 1
+    first_day = func.date(func.max(Borrows.due_date, since), "+1 day")
+    last_day = case((Borrows.return_date == None, through), else_=func.min(through, func.date(Borrows.return_date, "-1 day")))
+    return first_day, last_day, cast(func.julianday(last_day) - func.julianday(first_day), Integer) + 1
+
+# open loans come off ix_borrows_open_due_date and returned ones off ix_borrows_returned_return_date,
+# so the job never walks the full due_date history; each branch is batched on the key of its index
+def fine_accrual_branches(since: date, through: date):
+    return [
+        (Borrows.due_date, [Borrows.return_date == None, Borrows.due_date < through]),
+        (Borrows.return_date, [Borrows.return_date > since + timedelta(days=1)]),
+    ]
+
+def fine_batch_query(session: Session, since: date, through: date, key, criteria, lower: date | None, upper: date | None):
+    first_day, last_day, days = fine_window(session, since, through)
+    unfined = ~select(FineAccrual.id).where(FineAccrual.borrow_id == Borrows.id).where(FineAccrual.accrued_to > since).exists()
+    operation = (
+        select(
+            Borrows.patron_id,
+            Borrows.id.label("borrow_id"),
+            first_day.label("accrued_from"),
+            last_day.label("accrued_to"),
+            days.label("amount")
+        )
+        .where(*criteria)
+        .where(days > 0)
+        .where(unfined)
+    )
+    if lower is not None:
+        operation = operation.where(key >= lower)
+    if upper is not None:
+        operation = operation.where(key < upper)
+    return operation
+
+def fine_batch_bounds(session: Session, key, criteria, batch_size: int = FINE_BATCH_SIZE):
+    lower = None
+    while True:
+        operation = select(key).where(*criteria).order_by(key).offset(batch_size).limit(1)
+        if lower is not None:
+            operation = operation.where(key >= lower)
+        upper = session.scalar(operation)
+        if upper is not None and upper == lower:
+            upper = lower + timedelta(days=1)
+        yield lower, upper
+        if upper is None:
+            return
+        lower = upper
+
+def adjust_patron_fines(session: Session, accruals, sign: int = 1):
+    totals = select(FineAccrual.patron_id, func.sum(FineAccrual.amount).label("amount")).where(accruals).group_by(FineAccrual.patron_id).subquery()
+    session.execute(
+        update(Patron)
+        .where(Patron.id == totals.c.patron_id)
+        .values(fine=Patron.fine + sign * totals.c.amount)
+        .execution_options(synchronize_session=False)
+    )
+    amount = session.scalar(select(func.coalesce(func.sum(FineAccrual.amount), 0)).where(accruals))
+    bump_counters(session, fine_total=sign * amount)
+
+def accrue_fine_batch(session: Session, batch):
+    last_id = session.scalar(select(func.coalesce(func.max(FineAccrual.id), 0)))
+    session.execute(insert(FineAccrual).from_select(["patron_id", "borrow_id", "accrued_from", "accrued_to", "amount"], batch))
+    adjust_patron_fines(session, FineAccrual.id > last_id)
+    session.commit()
+
+# accruals past the watermark belong to a run that died between batch commits; back them out so the rerun starts clean
+def discard_unfinished_fines(session: Session, since: date):
+    adjust_patron_fines(session, FineAccrual.accrued_to > since, -1)
+    session.execute(delete(FineAccrual).where(FineAccrual.accrued_to > since))
+    session.commit()
+
+def accrue_fines(session: Session, since: date, through: date):
+    for key, criteria in fine_accrual_branches(since, through):
+        for lower, upper in fine_batch_bounds(session, key, criteria):
+            accrue_fine_batch(session, fine_batch_query(session, since, through, key, criteria, lower, upper))
+
+def calculate_patron_fines(session: Session = Depends(get_session), through: date | None = None):
     try:
-        today = date.today()
-        operation = select(Borrows).where(Borrows.due_date < today).where(Borrows.return_date == None)
-        overdue_books = session.exec(operation).all()
-        for book in overdue_books:
-            patron = session.exec(select(Patron).where(Patron.id == book.patron_id)).one()
-            patron.fine += 1
-            session.add(patron)
+        started = time.perf_counter()
+        through = through or date.today()
+        watermark = session.get(JobWatermark, FINE_JOB)
+        if watermark is None:
+            watermark = JobWatermark(name=FINE_JOB, last_run_date=through - timedelta(days=1))
+        since = watermark.last_run_date
+        if since >= through:
+            return {"days": 0, "loans_fined": 0, "patrons_fined": 0, "amount": 0, "elapsed_ms": 0}
+        discard_unfinished_fines(session, since)
+        accrue_fines(session, since, through)
+        loans_fined, patrons_fined, amount = session.execute(
+            select(func.count(FineAccrual.id), func.count(func.distinct(FineAccrual.patron_id)), func.coalesce(func.sum(FineAccrual.amount), 0))
+            .where(FineAccrual.accrued_to > since)
+        ).one()
+        watermark.last_run_date = through
+        session.add(watermark)
         session.commit()
+        metrics = {
+            "days": (through - since).days,
+            "loans_fined": loans_fined,
+            "patrons_fined": patrons_fined,
+            "amount": amount,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        logging.info(f"calculate_patron_fines: {metrics}")
+        return metrics
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
@@ -798,10 +1605,109 @@ def calculate_patron_fines(session: Session = Depends(get_session)):
         session.rollback()
         raise DatabaseError
 
+# export functions
+EXPORT_QUERIES = {
+    "borrows": borrow_export_query,
+    "books": lambda: select(Book.__table__).order_by(Book.isbn),
+    "patrons": lambda: select(Patron.__table__).order_by(Patron.id),
+}
+
+def export_batches(table: str, batch_size: int = EXPORT_BATCH_SIZE):
+    operation = EXPORT_QUERIES[table]().execution_options(yield_per=batch_size)
+    with Session(engine) as session:
+        result = session.execute(operation)
+        yield list(result.keys())
+        for partition in result.partitions():
+            yield partition
+
+def ndjson_lines(batches):
+    columns = next(batches)
+    for partition in batches:
+        yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in partition)
+
+def csv_lines(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(next(batches))
+    for partition in batches:
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def arrow_type(column):
+    python_type = column.type.python_type
+    if issubclass(python_type, bool):
+        return pa.bool_()
+    if issubclass(python_type, int):
+        return pa.int64()
+    if issubclass(python_type, float):
+        return pa.float64()
+    if issubclass(python_type, datetime):
+        return pa.timestamp("us")
+    if issubclass(python_type, date):
+        return pa.date32()
+    return pa.string()
+
+def arrow_schema(table: str):
+    return pa.schema([(column.key, arrow_type(column)) for column in EXPORT_QUERIES[table]().selected_columns])
+
+def arrow_record_batches(batches, schema):
+    next(batches)
+    for partition in batches:
+        columns = zip(*partition)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+def drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+def arrow_stream(batches, schema):
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        yield drain(buffer)
+        for record_batch in arrow_record_batches(batches, schema):
+            writer.write_batch(record_batch)
+            yield drain(buffer)
+    yield drain(buffer)
+
+def parquet_stream(batches, schema):
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema, compression=PARQUET_COMPRESSION) as writer:
+        for record_batch in arrow_record_batches(batches, schema):
+            writer.write_batch(record_batch)
+            yield drain(buffer)
+    yield drain(buffer)
+
+def export_arrow(table: str):
+    if table not in EXPORT_QUERIES:
+        raise NotFoundException(detail=EXPORT_NOT_FOUND)
+    return arrow_stream(export_batches(table), arrow_schema(table))
+
+def export_parquet(table: str):
+    if table not in EXPORT_QUERIES:
+        raise NotFoundException(detail=EXPORT_NOT_FOUND)
+    return parquet_stream(export_batches(table), arrow_schema(table))
+
+def export_ndjson(table: str):
+    if table not in EXPORT_QUERIES:
+        raise NotFoundException(detail=EXPORT_NOT_FOUND)
+    return ndjson_lines(export_batches(table))
+
+def export_csv(table: str):
+    if table not in EXPORT_QUERIES:
+        raise NotFoundException(detail=EXPORT_NOT_FOUND)
+    return csv_lines(export_batches(table))
+
 # aggregate functions
 def count_patrons(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Patron.id))).scalar()
+        count = read_counter(session, "patrons")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -812,7 +1718,7 @@ def count_patrons(session: Session = Depends(get_session)):
 
 def count_authors(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Author.id))).scalar()
+        count = read_counter(session, "authors")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -823,7 +1729,7 @@ def count_authors(session: Session = Depends(get_session)):
 
 def count_publishers(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Publisher.id))).scalar()
+        count = read_counter(session, "publishers")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -834,7 +1740,7 @@ def count_publishers(session: Session = Depends(get_session)):
 
 def count_books(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Book.isbn))).scalar()
+        count = read_counter(session, "books")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -845,7 +1751,7 @@ def count_books(session: Session = Depends(get_session)):
 
 def count_bookcopies(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(BookCopy.id))).scalar()
+        count = read_counter(session, "bookcopies")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -856,7 +1762,7 @@ def count_bookcopies(session: Session = Depends(get_session)):
 
 def count_transactions(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Borrows.id))).scalar()
+        count = read_counter(session, "transactions")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -867,7 +1773,7 @@ def count_transactions(session: Session = Depends(get_session)):
 
 def count_unreturned_bookcopies(session: Session = Depends(get_session)):
     try:
-        count = session.execute(select(func.count(Borrows.id)).where(Borrows.return_date == None)).scalar()
+        count = read_counter(session, "unreturned_bookcopies")
         return count
     except IntegrityError as e:
         session.rollback()
@@ -878,11 +1784,28 @@ def count_unreturned_bookcopies(session: Session = Depends(get_session)):
 
 def sum_of_patron_fines(session: Session = Depends(get_session)):
     try:
-        fine_total = session.execute(select(func.sum(Patron.fine))).scalar()
+        fine_total = read_counter(session, "fine_total")
         return fine_total
     except IntegrityError as e:
         session.rollback()
         raise DBIntegrityError
     except DatabaseError as e:
         session.rollback()
-        raise DatabaseError 
\ No newline at end of file
+        raise DatabaseError
+
+def get_library_stats(session: Session = Depends(get_session)):
+    try:
+        now = time.monotonic()
+        if stats_cache["stats"] is not None and now < stats_cache["expires_at"]:
+            return stats_cache["stats"]
+        stats = read_counters(session, *COUNTER_QUERIES)
+        stats["available_bookcopies"] = stats["bookcopies"] - stats["unreturned_bookcopies"]
+        stats_cache["stats"] = stats
+        stats_cache["expires_at"] = now + STATS_CACHE_TTL
+        return stats
+    except IntegrityError as e:
+        session.rollback()
+        raise DBIntegrityError
+    except DatabaseError as e:
+        session.rollback()
+        raise DatabaseError
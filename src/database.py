@@ -1,8 +1,99 @@
 from sqlmodel import SQLModel, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 import os
 
 data_dir = '/data'
 sqlite_file = os.path.join(data_dir, 'database.db')
 sqlite_url = f"sqlite:///{sqlite_file}"
 
-engine = create_engine(sqlite_url, echo=True)
\ No newline at end of file
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")) * -1,
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+ASYNC_MODE = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+def get_database_url():
+    url = os.getenv("DATABASE_URL", sqlite_url)
+    if "://" not in url:
+        url = f"sqlite:///{url}"
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+def web_workers():
+    return max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+
+def pool_size_for_workers():
+    workers = web_workers()
+    max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+    return int(os.getenv("DB_POOL_SIZE", max(max_connections // workers, 2)))
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+def pool_options(url):
+    sqlite = url.get_backend_name() == "sqlite"
+    if sqlite and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": pool_size_for_workers(),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false" if sqlite else "true").lower() == "true",
+    }
+
+def create_db_engine(url: str = None, echo: bool = None):
+    url = make_url(url or get_database_url())
+    if echo is None:
+        echo = os.getenv("DB_ECHO", "false").lower() == "true"
+    if url.get_backend_name() == "sqlite":
+        engine = create_engine(
+            url,
+            echo=echo,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000},
+            **pool_options(url),
+        )
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        return engine
+    return create_engine(url, echo=echo, **pool_options(url))
+
+def create_async_db_engine(url: str = None, echo: bool = None):
+    url = make_url(url or get_database_url())
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    if echo is None:
+        echo = os.getenv("DB_ECHO", "false").lower() == "true"
+    if url.get_backend_name() == "sqlite":
+        engine = create_async_engine(
+            url,
+            echo=echo,
+            connect_args={"timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000},
+            **pool_options(url),
+        )
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+        return engine
+    return create_async_engine(url, echo=echo, **pool_options(url))
+
+def is_sqlite(bind):
+    return bind.dialect.name == "sqlite"
+
+def is_postgresql(bind):
+    return bind.dialect.name == "postgresql"
+
+engine = create_db_engine()
+async_engine = create_async_db_engine() if ASYNC_MODE else None
@@ -6,6 +6,8 @@ PATRON_NAME_INVALID = "Patron name should be in the format <firstname><space><la
 
 DUPLICATE_BOOK_ISBN = "A book with this ISBN already exists."
 BOOK_NOT_FOUND = "Book not found"
+SEARCH_QUERY_INVALID = "Search query should contain at least one letter or digit."
+SEARCH_CURSOR_INVALID = "Search cursor should be a next_cursor value returned by a previous search page."
 
 DUPLICATE_AUTHOR = "An author with this name already exists."
 AUTHOR_NOT_FOUND = "Author not found"
@@ -15,4 +17,13 @@ DUPLICATE_PUBLISHER = "A publisher with this name already exists."
 PUBLISHER_NOT_FOUND = "Publisher not found"
 
 DUPLICATE_BORROW = "A transaction with these credentials already exists."
-BORROW_NOT_FOUND = "Transaction not found"
\ No newline at end of file
+BOOKCOPY_NOT_FOUND = "Book copy not found"
+BORROW_NOT_FOUND = "Transaction not found"
+
+EXPORT_NOT_FOUND = "No export is available for this table."
+IDEMPOTENCY_KEY_INVALID = "Idempotency-Key must be between 1 and 255 characters"
+IDEMPOTENCY_KEY_REUSED = "Idempotency-Key was already used with a different request"
+IDEMPOTENCY_KEY_IN_PROGRESS = "A request with this Idempotency-Key is still in progress"
+BOOK_IMPORT_FAILED = "Rejected because its import batch could not be written"
+IMPORT_FILE_UNREADABLE = "Import stopped, the file could not be read"
+PATRON_ENROLLMENT_FAILED = "Rejected because its enrollment batch could not be written"
\ No newline at end of file
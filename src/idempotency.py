@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+from sqlalchemy import update, delete, or_, func
+from database import engine
+from models import IdempotencyKey
+from exconstants import IDEMPOTENCY_KEY_INVALID, IDEMPOTENCY_KEY_REUSED, IDEMPOTENCY_KEY_IN_PROGRESS
+import asyncio
+import crud
+import hashlib
+import os
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL = timedelta(seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")))
+IDEMPOTENCY_LEASE = timedelta(seconds=int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60")))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENT_ROUTES = {
+    ("POST", "/borrows/"),
+    ("POST", "/patron/"),
+    ("POST", "/book/"),
+}
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def fingerprint(method: str, path: str, body: bytes):
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+# the owner renews renewed_at while its request runs; rows from before renewal fall back to claimed_at
+def is_abandoned(now: datetime):
+    lease = func.coalesce(IdempotencyKey.renewed_at, IdempotencyKey.claimed_at)
+    return (IdempotencyKey.status_code == None) & or_(lease == None, lease < now - IDEMPOTENCY_LEASE)
+
+def claim_key(key: str, request_fingerprint: str):
+    now = utcnow()
+    with Session(engine) as session:
+        session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where((IdempotencyKey.expires_at < now) | is_abandoned(now))
+        )
+        claimed = session.execute(
+            crud.dialect_insert(session, IdempotencyKey)
+            .values(key=key, fingerprint=request_fingerprint, claimed_at=now, renewed_at=now, expires_at=now + IDEMPOTENCY_TTL)
+            .on_conflict_do_nothing(index_elements=["key"])
+        )
+        session.commit()
+        if claimed.rowcount == 1:
+            return now, None
+        return None, session.exec(select(IdempotencyKey).where(IdempotencyKey.key == key)).one_or_none()
+
+def store_response(key: str, claimed_at: datetime, status_code: int, body: bytes):
+    with Session(engine) as session:
+        session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.claimed_at == claimed_at)
+            .values(status_code=status_code, response=body.decode())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+def renew_key(key: str, claimed_at: datetime):
+    with Session(engine) as session:
+        renewed = session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.claimed_at == claimed_at)
+            .where(IdempotencyKey.status_code == None)
+            .values(renewed_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return renewed.rowcount == 1
+
+async def keep_claim(key: str, claimed_at: datetime):
+    renewed = True
+    while renewed:
+        await asyncio.sleep(IDEMPOTENCY_LEASE.total_seconds() / 3)
+        renewed = await run_in_threadpool(renew_key, key, claimed_at)
+
+def release_key(key: str, claimed_at: datetime):
+    with Session(engine) as session:
+        session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.claimed_at == claimed_at)
+        )
+        session.commit()
+
+def purge_expired_keys(session: Session):
+    purged = session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < utcnow()))
+    session.commit()
+    return purged.rowcount
+
+def replay(stored: IdempotencyKey, request_fingerprint: str):
+    if stored.fingerprint != request_fingerprint:
+        return JSONResponse(status_code=422, content={"message": IDEMPOTENCY_KEY_REUSED})
+    if stored.status_code is None:
+        return JSONResponse(status_code=409, content={"message": IDEMPOTENCY_KEY_IN_PROGRESS})
+    return Response(
+        content=stored.response,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+async def idempotency_middleware(request: Request, call_next):
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None or (request.method, request.url.path) not in IDEMPOTENT_ROUTES:
+        return await call_next(request)
+    key = key.strip()
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return JSONResponse(status_code=400, content={"message": IDEMPOTENCY_KEY_INVALID})
+
+    request_fingerprint = fingerprint(request.method, request.url.path, await request.body())
+    claimed_at, stored = await run_in_threadpool(claim_key, key, request_fingerprint)
+    if claimed_at is None:
+        if stored is None:
+            return JSONResponse(status_code=409, content={"message": IDEMPOTENCY_KEY_IN_PROGRESS})
+        return replay(stored, request_fingerprint)
+
+    renewal = asyncio.create_task(keep_claim(key, claimed_at))
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except Exception:
+        await run_in_threadpool(release_key, key, claimed_at)
+        raise
+    finally:
+        renewal.cancel()
+    # only successes are replayed; a 4xx or 5xx frees the key so a corrected retry runs for real
+    if 200 <= response.status_code < 300:
+        await run_in_threadpool(store_response, key, claimed_at, response.status_code, body)
+    else:
+        await run_in_threadpool(release_key, key, claimed_at)
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        media_type=response.media_type
+    )
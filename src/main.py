@@ -4,11 +4,10 @@ from fastapi.responses import JSONResponse
 from exceptions import NotFoundException, InvalidRequestException, DuplicateEntryException, DBIntegrityError
 from sqlmodel import Session, select
 from datetime import date
-import models, schemas, crud
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+import models, schemas, crud, scheduler, migrations, typeahead, idempotency
+from database import async_engine
 from fastapi.middleware.cors import CORSMiddleware
-from routers import author, book, borrows, patron, publisher, bookcopy
+from routers import author, book, borrows, patron, publisher, bookcopy, stats, export
 from sqlalchemy.exc import DatabaseError
 import sys
 import logging
@@ -23,6 +22,9 @@ logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 @app.on_event("shutdown")
 async def shutdown_event():
     logging.info("Shutting down...")
+    scheduler.stop_scheduler(getattr(app.state, "scheduler", None))
+    if async_engine is not None:
+        await async_engine.dispose()
 
 @app.middleware("http")
 async def error_handling_middleware(request: Request, call_next):
@@ -56,6 +58,8 @@ async def error_handling_middleware(request: Request, call_next):
         return JSONResponse(status_code=500, content={"message": "Internal server error"})
     return response
 
+app.middleware("http")(idempotency.idempotency_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8051"],
@@ -70,33 +74,18 @@ app.include_router(publisher.router, prefix="/publisher", tags=["publisher"])
 app.include_router(book.router, prefix="/book", tags=["book"])
 app.include_router(borrows.router, prefix="/borrows", tags=["borrows"])
 app.include_router(bookcopy.router, prefix="/bookcopy", tags=["bookcopy"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(export.router, prefix="/export", tags=["export"])
 
 
-def calculate_patron_fines():
-    with crud.get_session() as session:
-        today = date.today()
-        operation = select(models.Borrows).where(models.Borrows.due_date < today).where(models.Borrows.return_date == None)
-        overdue_books = session.exec(operation).all()
-        for book in overdue_books:
-            patron = session.exec(select(models.Patron).where(models.Patron.id == book.patron_id)).one()
-            patron.fine += 1
-            session.add(patron)
-        session.commit()
-
 @app.on_event("startup")
 def on_startup():
     logging.info("Starting up...")
-    models.SQLModel.metadata.create_all(crud.engine)
-    scheduler = BackgroundScheduler()
-    scheduler.start()
-
-    scheduler.add_job(
-        calculate_patron_fines,
-        trigger=CronTrigger(hour=11, minute=22, second=5),
-        id='calculate_patron_fines',
-        name='Calculate Patron Fines',
-        replace_existing=True
-    )
+    migrations.upgrade(crud.engine)
+    with Session(crud.engine) as session:
+        crud.ensure_library_counters(session)
+    typeahead.build_indexes()
+    app.state.scheduler = scheduler.start_background_scheduler()
 
 @app.get("/")
 def greet():
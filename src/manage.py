@@ -0,0 +1,35 @@
+from sqlmodel import Session
+from database import engine
+import crud
+import migrations
+import argparse
+import logging
+import sys
+
+
+def reconcile_counters(args):
+    with Session(engine) as session:
+        counters = crud.reconcile_library_counters(session)
+    for name, value in counters.items():
+        logging.info(f"{name}: {value}")
+
+def rebuild_search_index(args):
+    with engine.begin() as connection:
+        migrations.rebuild_book_search(connection)
+    logging.info("Rebuilt the book search index")
+
+COMMANDS = {
+    "reconcile-counters": reconcile_counters,
+    "rebuild-search-index": rebuild_search_index,
+}
+
+def main(argv=None):
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    parser = argparse.ArgumentParser(prog="manage.py", description="biblio maintenance commands")
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args(argv)
+    migrations.upgrade(engine)
+    COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+from sqlmodel import SQLModel
+from sqlalchemy import text, select, insert, update, delete, inspect, func, literal
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date, datetime, timedelta, timezone
+from database import is_postgresql
+from models import PatronStatusEnum, SchemaMigration, NameTrigram, Patron, BookCopy, Borrows, IdempotencyKey, LibraryCounter, FineAccrual, JobWatermark
+import crud
+import logging
+import os
+
+
+BACKFILL_CHUNK_SIZE = int(os.getenv("BACKFILL_CHUNK_SIZE", "5000"))
+
+SQLITE_BOOK_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS book_search USING fts5(
+        title, author, publisher,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    "INSERT INTO book_search(book_search, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0)')",
+    """
+    CREATE TRIGGER IF NOT EXISTS book_search_insert AFTER INSERT ON book BEGIN
+        INSERT INTO book_search(rowid, title, author, publisher) VALUES (
+            new.rowid,
+            new.title,
+            (SELECT first_name || ' ' || midname_initial || ' ' || last_name FROM author WHERE id = new.author_id),
+            (SELECT name FROM publisher WHERE id = new.publisher_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_search_update AFTER UPDATE OF title, author_id, publisher_id ON book BEGIN
+        DELETE FROM book_search WHERE rowid = old.rowid;
+        INSERT INTO book_search(rowid, title, author, publisher) VALUES (
+            new.rowid,
+            new.title,
+            (SELECT first_name || ' ' || midname_initial || ' ' || last_name FROM author WHERE id = new.author_id),
+            (SELECT name FROM publisher WHERE id = new.publisher_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_search_delete AFTER DELETE ON book BEGIN
+        DELETE FROM book_search WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_search_author_update AFTER UPDATE OF first_name, midname_initial, last_name ON author BEGIN
+        UPDATE book_search SET author = new.first_name || ' ' || new.midname_initial || ' ' || new.last_name
+        WHERE rowid IN (SELECT rowid FROM book WHERE author_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_search_publisher_update AFTER UPDATE OF name ON publisher BEGIN
+        UPDATE book_search SET publisher = new.name
+        WHERE rowid IN (SELECT rowid FROM book WHERE publisher_id = new.id);
+    END
+    """,
+]
+
+SQLITE_BOOK_SEARCH_REBUILD = [
+    "DELETE FROM book_search",
+    """
+    INSERT INTO book_search(rowid, title, author, publisher)
+    SELECT
+        book.rowid,
+        book.title,
+        (SELECT first_name || ' ' || midname_initial || ' ' || last_name FROM author WHERE id = book.author_id),
+        (SELECT name FROM publisher WHERE id = book.publisher_id)
+    FROM book
+    """,
+    "INSERT INTO book_search(book_search) VALUES ('optimize')",
+]
+
+POSTGRESQL_BOOK_SEARCH = [
+    """
+    CREATE TABLE IF NOT EXISTS book_search (
+        isbn VARCHAR(13) PRIMARY KEY REFERENCES book (isbn) ON DELETE CASCADE ON UPDATE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_book_search_document ON book_search USING gin (document)",
+    """
+    CREATE OR REPLACE FUNCTION book_search_document(book_title TEXT, book_author_id INTEGER, book_publisher_id INTEGER)
+    RETURNS TSVECTOR AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(book_title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT first_name || ' ' || midname_initial || ' ' || last_name FROM author WHERE id = book_author_id), ''
+            )), 'B')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM publisher WHERE id = book_publisher_id), ''
+            )), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION book_search_sync() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO book_search (isbn, document)
+        VALUES (NEW.isbn, book_search_document(NEW.title, NEW.author_id, NEW.publisher_id))
+        ON CONFLICT (isbn) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION book_search_author_sync() RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE book_search SET document = book_search_document(book.title, book.author_id, book.publisher_id)
+        FROM book WHERE book.isbn = book_search.isbn AND book.author_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION book_search_publisher_sync() RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE book_search SET document = book_search_document(book.title, book.author_id, book.publisher_id)
+        FROM book WHERE book.isbn = book_search.isbn AND book.publisher_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER book_search_sync AFTER INSERT OR UPDATE OF title, author_id, publisher_id ON book
+    FOR EACH ROW EXECUTE FUNCTION book_search_sync()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER book_search_author_sync AFTER UPDATE OF first_name, midname_initial, last_name ON author
+    FOR EACH ROW EXECUTE FUNCTION book_search_author_sync()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER book_search_publisher_sync AFTER UPDATE OF name ON publisher
+    FOR EACH ROW EXECUTE FUNCTION book_search_publisher_sync()
+    """,
+]
+
+POSTGRESQL_BOOK_SEARCH_REBUILD = [
+    "DELETE FROM book_search",
+    """
+    INSERT INTO book_search (isbn, document)
+    SELECT isbn, book_search_document(title, author_id, publisher_id) FROM book
+    """,
+]
+
+POSTGRESQL_NAME_TRIGRAMS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_patron_name_trgm ON patron USING gin ((first_name || ' ' || last_name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_author_name_trgm ON author USING gin ((first_name || ' ' || midname_initial || ' ' || last_name) gin_trgm_ops)",
+]
+
+BOOK_FILTER_INDEXES = [
+    "DROP INDEX IF EXISTS ix_book_genre",
+    "DROP INDEX IF EXISTS ix_book_author_id",
+    "DROP INDEX IF EXISTS ix_book_publisher_id",
+    "CREATE INDEX IF NOT EXISTS ix_book_genre_isbn ON book (genre, isbn)",
+    "CREATE INDEX IF NOT EXISTS ix_book_author_id_isbn ON book (author_id, isbn)",
+    "CREATE INDEX IF NOT EXISTS ix_book_publisher_id_isbn ON book (publisher_id, isbn)",
+]
+
+COPY_STATUS = [
+    "CREATE INDEX IF NOT EXISTS ix_bookcopy_status ON bookcopy (status)",
+    "CREATE INDEX IF NOT EXISTS ix_bookcopy_current_borrow_id ON bookcopy (current_borrow_id)",
+    """
+    UPDATE bookcopy SET
+        status = 'ON_LOAN',
+        current_borrow_id = (
+            SELECT max(borrows.id) FROM borrows
+            WHERE borrows.copy_id = bookcopy.id AND borrows.return_date IS NULL
+        )
+    WHERE id IN (SELECT copy_id FROM borrows WHERE return_date IS NULL)
+    """,
+]
+
+PATRON_OPEN_LOANS = [
+    """
+    UPDATE patron SET open_loans = (
+        SELECT count(*) FROM borrows
+        WHERE borrows.patron_id = patron.id AND borrows.return_date IS NULL
+    )
+    """,
+]
+
+UNIQUE_OPEN_BORROWS = [
+    "DROP INDEX IF EXISTS ix_borrows_open_copy_id",
+]
+
+SQLITE_OPTIMIZE = [
+    "PRAGMA analysis_limit=1000",
+    "PRAGMA optimize=0x10002",
+]
+
+STRIPED_COUNTERS = [
+    "INSERT INTO library_counter_slots (name, slot, value) SELECT name, 0, value FROM library_counters",
+    "DROP TABLE library_counters",
+]
+
+RETURN_DATE_INDEX = [
+    "DROP INDEX IF EXISTS ix_borrows_return_date",
+]
+
+def execute_all(connection, statements):
+    for statement in statements:
+        connection.execute(text(statement))
+
+def rebuild_book_search(connection):
+    if is_postgresql(connection):
+        execute_all(connection, POSTGRESQL_BOOK_SEARCH_REBUILD)
+    else:
+        execute_all(connection, SQLITE_BOOK_SEARCH_REBUILD)
+
+def optimize_database(connection):
+    if not is_postgresql(connection):
+        execute_all(connection, SQLITE_OPTIMIZE)
+
+def create_book_search(connection):
+    if is_postgresql(connection):
+        execute_all(connection, POSTGRESQL_BOOK_SEARCH)
+    else:
+        execute_all(connection, SQLITE_BOOK_SEARCH)
+    rebuild_book_search(connection)
+
+def create_name_trigrams(connection):
+    if is_postgresql(connection):
+        execute_all(connection, POSTGRESQL_NAME_TRIGRAMS)
+        return
+    for kind, (model, key, columns) in crud.NAME_SEARCHES.items():
+        names = connection.execute(select(key, crud.name_expression(columns)).execution_options(yield_per=BACKFILL_CHUNK_SIZE))
+        for partition in names.partitions():
+            connection.execute(insert(NameTrigram), [
+                {"kind": kind, "trigram": trigram, "owner_id": str(owner_id)}
+                for owner_id, name in partition
+                for trigram in crud.name_trigrams(name)
+            ])
+
+def add_column(connection, model, name: str, default: str | None = None):
+    table_name = model.__tablename__
+    if name in {column["name"] for column in inspect(connection).get_columns(table_name)}:
+        return
+    column_type = model.__table__.c[name].type
+    if hasattr(column_type, "create"):
+        column_type.create(connection, checkfirst=True)
+    definition = column_type.compile(dialect=connection.dialect)
+    if default is not None:
+        definition += f" NOT NULL DEFAULT {default}"
+    connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {definition}"))
+
+def create_indexes(connection, model, *names: str):
+    for index in model.__table__.indexes:
+        if index.name in names:
+            index.create(connection, checkfirst=True)
+
+def create_book_filter_indexes(connection):
+    execute_all(connection, BOOK_FILTER_INDEXES)
+
+def add_copy_status(connection):
+    add_column(connection, BookCopy, "status", "'AVAILABLE'")
+    add_column(connection, BookCopy, "current_borrow_id")
+    execute_all(connection, COPY_STATUS)
+
+def create_open_borrow_indexes(connection):
+    create_indexes(connection, Borrows, "ix_borrows_open_copy_id", "ix_borrows_open_patron_id", "ix_borrows_open_due_date")
+
+def add_patron_open_loans(connection):
+    add_column(connection, Patron, "open_loans", "0")
+    execute_all(connection, PATRON_OPEN_LOANS)
+    patrons = Patron.__table__
+    connection.execute(update(patrons).where(patrons.c.open_loans > 0).values(status=PatronStatusEnum.ACTIVE))
+    connection.execute(update(patrons).where(patrons.c.open_loans == 0).values(status=PatronStatusEnum.INACTIVE))
+
+def duplicate_open_borrows(connection):
+    duplicated = (
+        select(Borrows.copy_id)
+        .where(Borrows.return_date == None)
+        .group_by(Borrows.copy_id)
+        .having(func.count(Borrows.id) > 1)
+    )
+    rows = connection.execute(
+        select(Borrows.copy_id, Borrows.id)
+        .where(Borrows.return_date == None)
+        .where(Borrows.copy_id.in_(duplicated))
+        .order_by(Borrows.copy_id, Borrows.id)
+    ).all()
+    duplicates = {}
+    for copy_id, transaction_id in rows:
+        duplicates.setdefault(copy_id, []).append(transaction_id)
+    return duplicates
+
+def create_unique_open_borrow_index(connection):
+    duplicates = duplicate_open_borrows(connection)
+    if duplicates:
+        listing = "; ".join(f"copy {copy_id}: transaction_ids {transaction_ids}" for copy_id, transaction_ids in duplicates.items())
+        raise RuntimeError(
+            "Cannot create ix_borrows_open_copy_id: some copies have more than one open borrow. "
+            f"Return all but one of them through PUT /borrows/return/{{transaction_id}} and restart. {listing}"
+        )
+    execute_all(connection, UNIQUE_OPEN_BORROWS)
+    create_indexes(connection, Borrows, "ix_borrows_open_copy_id")
+
+def create_returned_date_index(connection):
+    execute_all(connection, RETURN_DATE_INDEX)
+    create_indexes(connection, Borrows, "ix_borrows_returned_return_date")
+
+def add_idempotency_claimed_at(connection):
+    add_column(connection, IdempotencyKey, "claimed_at")
+
+def add_idempotency_renewed_at(connection):
+    add_column(connection, IdempotencyKey, "renewed_at")
+
+def stripe_library_counters(connection):
+    if inspect(connection).has_table("library_counters"):
+        execute_all(connection, STRIPED_COUNTERS)
+
+def seed_fine_opening_balances(connection):
+    if connection.execute(select(JobWatermark.name).where(JobWatermark.name == crud.FINE_JOB)).first():
+        return
+    opening = date.today() - timedelta(days=1)
+    connection.execute(
+        insert(FineAccrual).from_select(
+            ["patron_id", "accrued_from", "accrued_to", "amount"],
+            select(Patron.id, literal(opening), literal(opening), Patron.fine).where(Patron.fine > 0)
+        )
+    )
+    connection.execute(insert(JobWatermark).values(name=crud.FINE_JOB, last_run_date=opening))
+    connection.execute(delete(LibraryCounter).where(LibraryCounter.name == "fine_total"))
+    connection.execute(insert(LibraryCounter).values(name="fine_total", slot=0, value=crud.COUNTER_QUERIES["fine_total"].scalar_subquery()))
+
+MIGRATIONS = [
+    ("0001_book_search", create_book_search),
+    ("0002_name_trigrams", create_name_trigrams),
+    ("0003_book_filter_indexes", create_book_filter_indexes),
+    ("0004_copy_status", add_copy_status),
+    ("0005_open_borrow_indexes", create_open_borrow_indexes),
+    ("0006_patron_open_loans", add_patron_open_loans),
+    ("0007_unique_open_borrows", create_unique_open_borrow_index),
+    ("0008_returned_date_index", create_returned_date_index),
+    ("0009_idempotency_claimed_at", add_idempotency_claimed_at),
+    ("0010_striped_counters", stripe_library_counters),
+    ("0011_fine_opening_balances", seed_fine_opening_balances),
+    ("0012_idempotency_renewed_at", add_idempotency_renewed_at),
+]
+
+def claim_migration(connection, name: str):
+    operation = postgresql_insert(SchemaMigration) if is_postgresql(connection) else sqlite_insert(SchemaMigration)
+    operation = operation.values(name=name, applied_at=datetime.now(timezone.utc)).on_conflict_do_nothing(index_elements=["name"])
+    return connection.execute(operation).rowcount == 1
+
+def upgrade(engine):
+    SQLModel.metadata.create_all(engine)
+    for name, migration in MIGRATIONS:
+        with engine.begin() as connection:
+            if not claim_migration(connection, name):
+                continue
+            logging.info(f"Applying migration {name}")
+            migration(connection)
+    with engine.begin() as connection:
+        optimize_database(connection)
\ No newline at end of file
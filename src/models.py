@@ -1,11 +1,16 @@
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import date
+from sqlalchemy import Index, text
+from datetime import date, datetime
 from enum import Enum as PyEnum
 
 class PatronStatusEnum(str, PyEnum):
     INACTIVE = "IN"
     ACTIVE = "AC"
 
+class CopyStatusEnum(str, PyEnum):
+    AVAILABLE = "AV"
+    ON_LOAN = "OL"
+
 class Patron(SQLModel, table=True):
     id: str = Field(max_length=10, min_length=10, primary_key=True, index=True)
     first_name: str = Field(max_length=25, min_length=1, nullable=False, index=True)
@@ -14,8 +19,10 @@ class Patron(SQLModel, table=True):
     phone: str = Field(max_length=10, min_length=10, nullable=False, unique=True)
     status: PatronStatusEnum = Field(max_length=2, min_length=2, nullable=False, default=PatronStatusEnum.INACTIVE, index=True)
     fine: int = Field(default=0, nullable=False)
+    open_loans: int = Field(default=0, nullable=False)
 
     borrows: list["Borrows"] | None = Relationship(back_populates="patron", sa_relationship_kwargs={"cascade": "delete, delete-orphan"})
+    fine_accruals: list["FineAccrual"] | None = Relationship(back_populates="patron", sa_relationship_kwargs={"cascade": "delete, delete-orphan"})
 
 class Publisher(SQLModel, table=True):
     id: int | None = Field(primary_key=True, index=True, default=None)
@@ -32,11 +39,17 @@ class Author(SQLModel, table=True):
     book: list["Book"] | None = Relationship(back_populates="author", sa_relationship_kwargs={"cascade": "delete, delete-orphan"})
 
 class Book(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_book_genre_isbn", "genre", "isbn"),
+        Index("ix_book_author_id_isbn", "author_id", "isbn"),
+        Index("ix_book_publisher_id_isbn", "publisher_id", "isbn"),
+    )
+
     isbn: str = Field(max_length=13, min_length=13, primary_key=True, index=True)
     title: str = Field(max_length=255, min_length=1, nullable=False, index=True)
-    genre: str = Field(max_length=25, nullable=False, index=True)
-    author_id: int = Field(nullable=False, index=True, foreign_key="author.id")
-    publisher_id: int = Field(nullable=False, index=True, foreign_key="publisher.id")
+    genre: str = Field(max_length=25, nullable=False)
+    author_id: int = Field(nullable=False, foreign_key="author.id")
+    publisher_id: int = Field(nullable=False, foreign_key="publisher.id")
     published_year: int = Field(nullable=False, index=True)
     qty: int = Field(nullable=False, default=1)
 
@@ -47,17 +60,79 @@ class Book(SQLModel, table=True):
 class BookCopy(SQLModel, table=True):
     id: int | None = Field(primary_key=True, index=True, default=None)
     isbn: str = Field(max_length=13, min_length=13, index=True, foreign_key="book.isbn")
+    status: CopyStatusEnum = Field(max_length=2, min_length=2, nullable=False, default=CopyStatusEnum.AVAILABLE, index=True)
+    current_borrow_id: int | None = Field(nullable=True, index=True, default=None)
 
     book: Book = Relationship(back_populates="bookcopy")
     borrows: list["Borrows"] = Relationship(back_populates="bookcopy", sa_relationship_kwargs={"cascade": "delete, delete-orphan"})
 
 class Borrows(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_borrows_open_copy_id", "copy_id", unique=True, sqlite_where=text("return_date IS NULL"), postgresql_where=text("return_date IS NULL")),
+        Index("ix_borrows_open_patron_id", "patron_id", sqlite_where=text("return_date IS NULL"), postgresql_where=text("return_date IS NULL")),
+        Index("ix_borrows_open_due_date", "due_date", sqlite_where=text("return_date IS NULL"), postgresql_where=text("return_date IS NULL")),
+        Index("ix_borrows_returned_return_date", "return_date", sqlite_where=text("return_date IS NOT NULL"), postgresql_where=text("return_date IS NOT NULL")),
+    )
+
     id: int | None = Field(primary_key=True, index=True, default=None)
     patron_id: str = Field(max_length=10, min_length=10, nullable=False, index=True, foreign_key="patron.id")
     copy_id: int = Field(nullable=False, index=True, foreign_key="bookcopy.id")
     borrow_date: date = Field(nullable=False, index=True)
     due_date: date = Field(nullable=False, index=True)
-    return_date: date = Field(nullable=True, index=True)    
+    return_date: date = Field(nullable=True)
 
     patron: Patron = Relationship(back_populates="borrows")
-    bookcopy: BookCopy = Relationship(back_populates="borrows")
\ No newline at end of file
+    bookcopy: BookCopy = Relationship(back_populates="borrows")
+
+class FineAccrual(SQLModel, table=True):
+    id: int | None = Field(primary_key=True, index=True, default=None)
+    patron_id: str = Field(max_length=10, min_length=10, nullable=False, index=True, foreign_key="patron.id")
+    borrow_id: int | None = Field(nullable=True, index=True, foreign_key="borrows.id", ondelete="SET NULL", default=None)
+    accrued_from: date = Field(nullable=False)
+    accrued_to: date = Field(nullable=False, index=True)
+    amount: int = Field(nullable=False)
+
+    patron: Patron = Relationship(back_populates="fine_accruals")
+
+class JobWatermark(SQLModel, table=True):
+    name: str = Field(max_length=50, primary_key=True)
+    last_run_date: date = Field(nullable=False)
+
+class SchedulerLease(SQLModel, table=True):
+    name: str = Field(max_length=50, primary_key=True)
+    holder: str = Field(max_length=100, nullable=False)
+    expires_at: datetime = Field(nullable=False)
+
+class LibraryCounter(SQLModel, table=True):
+    __tablename__ = "library_counter_slots"
+
+    name: str = Field(max_length=50, primary_key=True)
+    slot: int = Field(primary_key=True, default=0)
+    value: int = Field(nullable=False, default=0)
+
+class SchemaMigration(SQLModel, table=True):
+    __tablename__ = "schema_migrations"
+
+    name: str = Field(max_length=100, primary_key=True)
+    applied_at: datetime = Field(nullable=False)
+
+
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+
+    key: str = Field(max_length=255, primary_key=True)
+    fingerprint: str = Field(max_length=64, nullable=False)
+    status_code: int | None = Field(nullable=True, default=None)
+    response: str | None = Field(nullable=True, default=None)
+    claimed_at: datetime | None = Field(nullable=True, default=None)
+    renewed_at: datetime | None = Field(nullable=True, default=None)
+    expires_at: datetime = Field(nullable=False, index=True)
+
+
+class NameTrigram(SQLModel, table=True):
+    __tablename__ = "name_trigrams"
+    __table_args__ = (Index("ix_name_trigrams_owner", "owner_id", "kind"),)
+
+    kind: str = Field(max_length=10, primary_key=True)
+    trigram: str = Field(max_length=3, primary_key=True)
+    owner_id: str = Field(max_length=20, primary_key=True)
\ No newline at end of file
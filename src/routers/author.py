@@ -1,6 +1,8 @@
-from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi import FastAPI, Depends, Path, Query, HTTPException, APIRouter
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+import models, schemas, crud, acrud, typeahead
 
 router = APIRouter()
 
@@ -8,14 +10,27 @@ router = APIRouter()
 def create_author(author: schemas.CreateAuthor, session: Session = Depends(crud.get_session)):
     return crud.create_author(author, session)
 
-@router.get("/all")
-def show_books(session: Session = Depends(crud.get_session)):
-    return crud.get_all_authors(session)
+if ASYNC_MODE:
+    @router.get("/all")
+    async def show_books(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_all_authors(session, limit, after)
+else:
+    @router.get("/all")
+    def show_books(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: Session = Depends(crud.get_session)):
+        return crud.get_all_authors(session, limit, after)
+
+@router.get("/autocomplete")
+def autocomplete_authors(q: str = "", limit: int = Query(typeahead.TYPEAHEAD_LIMIT, ge=1, le=typeahead.TYPEAHEAD_MAX_LIMIT)):
+    return typeahead.suggest("authors", q, limit)
 
 @router.get("/count")
 def get_patron_count(session: Session = Depends(crud.get_session)):
     return crud.count_authors(session)
 
+@router.get("/search")
+def search_authors(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=crud.MAX_PAGE_SIZE), session: Session = Depends(crud.get_session)):
+    return crud.search_authors(session, q, limit)
+
 @router.get("/name/{author_name}")
 def show_authors_by_name(author_name: str, session: Session = Depends(crud.get_session)):
     return crud.get_author_by_name(author_name, session)
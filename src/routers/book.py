@@ -1,6 +1,10 @@
-from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi import FastAPI, Depends, Path, Query, HTTPException, APIRouter, Request
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+from routers import uploads
+import models, schemas, crud, acrud, typeahead
 
 router = APIRouter()
 
@@ -8,14 +12,42 @@ router = APIRouter()
 def create_book(book: schemas.CreateBook, session: Session = Depends(crud.get_session)):
     return crud.create_book(book, session)
 
-@router.get("/all")
-def show_books(session: Session = Depends(crud.get_session)):
-    return crud.get_all_books(session)
+if ASYNC_MODE:
+    @router.get("/all")
+    async def show_books(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: str | None = None, session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_all_books(session, limit, after)
+else:
+    @router.get("/all")
+    def show_books(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: str | None = None, session: Session = Depends(crud.get_session)):
+        return crud.get_all_books(session, limit, after)
+
+@router.get("/autocomplete")
+def autocomplete_books(q: str = "", limit: int = Query(typeahead.TYPEAHEAD_LIMIT, ge=1, le=typeahead.TYPEAHEAD_MAX_LIMIT)):
+    return typeahead.suggest("titles", q, limit)
 
 @router.get("/count")
 def get_patron_count(session: Session = Depends(crud.get_session)):
     return crud.count_books(session)
 
+@router.get("/search")
+def search_books(
+    q: str | None = Query(None, min_length=1, max_length=255),
+    genre: str | None = None,
+    author_id: int | None = None,
+    publisher_id: int | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    available: bool | None = None,
+    limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    after: str | None = None,
+    session: Session = Depends(crud.get_session)
+):
+    return crud.search_books(
+        session, q, limit, after,
+        genre=genre, author_id=author_id, publisher_id=publisher_id,
+        year_from=year_from, year_to=year_to, available=available
+    )
+
 @router.get("/isbn/{isbn}")
 def show_books_by_isbn(isbn: str = Path(..., min_length=10, max_length=13), session: Session = Depends(crud.get_session)):
     body = schemas.ReadBook(isbn=isbn)
@@ -38,6 +70,20 @@ def show_books_by_author(author_name: str, session: Session = Depends(crud.get_s
 def show_books_by_publisher(publisher_name: str, session: Session = Depends(crud.get_session)):
     return crud.get_book_by_publisher(publisher_name, session)
 
+@router.post("/import")
+async def import_books(request: Request, format: str = Query("csv", pattern="^(csv|ndjson)$"), session: Session = Depends(crud.get_session)):
+    with await uploads.spool_request(request) as stream:
+        return await run_in_threadpool(crud.import_books, stream, format, session)
+
+@router.post("/availability")
+def show_books_availability(body: schemas.ReadBookAvailability, session: Session = Depends(crud.get_session)):
+    return crud.get_books_availability(body, session)
+
+@router.get("/{isbn}/availability")
+def show_book_availability(isbn: str = Path(..., min_length=10, max_length=13), session: Session = Depends(crud.get_session)):
+    isbn_val = schemas.ReadBook(isbn=isbn)
+    return crud.get_book_availability(isbn_val, session)
+
 @router.patch("/{isbn}")
 def update_book(body: schemas.UpdateBook, isbn: str = Path(..., min_length=10, max_length=13), session: Session = Depends(crud.get_session)):
     isbn_val = schemas.ReadBook(isbn=isbn)
@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+import models, schemas, crud, acrud
 
 router = APIRouter()
 
@@ -8,13 +10,23 @@ router = APIRouter()
 def get_patron_count(session: Session = Depends(crud.get_session)):
     return crud.count_bookcopies(session)
 
-@router.get("/overdue")
-def overdue_bookcopies(session: Session = Depends(crud.get_session)):
-    return crud.get_overdue_bookcopies(session)
+if ASYNC_MODE:
+    @router.get("/overdue")
+    async def overdue_bookcopies(session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_overdue_bookcopies(session)
+else:
+    @router.get("/overdue")
+    def overdue_bookcopies(session: Session = Depends(crud.get_session)):
+        return crud.get_overdue_bookcopies(session)
 
-@router.get("/available")
-def available_bookcopies(session: Session = Depends(crud.get_session)):
-    return crud.get_available_bookcopies(session)
+if ASYNC_MODE:
+    @router.get("/available")
+    async def available_bookcopies(session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_available_bookcopies(session)
+else:
+    @router.get("/available")
+    def available_bookcopies(session: Session = Depends(crud.get_session)):
+        return crud.get_available_bookcopies(session)
 
 @router.get("/unreturnedcount")
 def get_unreturned_count(session: Session = Depends(crud.get_session)):
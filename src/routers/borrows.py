@@ -1,6 +1,8 @@
-from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi import FastAPI, Depends, Path, Query, HTTPException, APIRouter
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+import models, schemas, crud, acrud
 
 router = APIRouter()
 
@@ -8,14 +10,27 @@ router = APIRouter()
 def create_borrow(borrows: schemas.AddBorrow, session: Session = Depends(crud.get_session)):
     return crud.create_borrow(borrows, session)
 
-@router.get("/all")
-def show_borrows(session: Session = Depends(crud.get_session)):
-    return crud.get_all_borrows(session)
+@router.post("/batch")
+def create_borrows(borrows: schemas.AddBorrowBatch, session: Session = Depends(crud.get_session)):
+    return crud.create_borrows(borrows, session)
+
+if ASYNC_MODE:
+    @router.get("/all")
+    async def show_borrows(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_all_borrows(session, limit, after)
+else:
+    @router.get("/all")
+    def show_borrows(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: Session = Depends(crud.get_session)):
+        return crud.get_all_borrows(session, limit, after)
 
 @router.get("/count")
 def get_borrow_count(session: Session = Depends(crud.get_session)):
     return crud.count_transactions(session)
 
+@router.put("/return/batch")
+def return_borrows(borrows: schemas.ReturnBorrowBatch, session: Session = Depends(crud.get_session)):
+    return crud.return_borrows(borrows, session)
+
 @router.put("/return/{transaction_id}")
 def return_borrow(transaction_id: int, borrow: schemas.ReturnBorrow, session: Session = Depends(crud.get_session)):
     return crud.return_borrow(transaction_id, borrow, session)
@@ -0,0 +1,37 @@
+from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi.responses import StreamingResponse
+import models, schemas, crud
+
+router = APIRouter()
+
+@router.get("/{table}.ndjson")
+def export_ndjson(table: str):
+    return StreamingResponse(
+        crud.export_ndjson(table),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{table}.ndjson"'}
+    )
+
+@router.get("/{table}.csv")
+def export_csv(table: str):
+    return StreamingResponse(
+        crud.export_csv(table),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{table}.csv"'}
+    )
+
+@router.get("/{table}.arrow")
+def export_arrow(table: str):
+    return StreamingResponse(
+        crud.export_arrow(table),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={"Content-Disposition": f'attachment; filename="{table}.arrow"'}
+    )
+
+@router.get("/{table}.parquet")
+def export_parquet(table: str):
+    return StreamingResponse(
+        crud.export_parquet(table),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{table}.parquet"'}
+    )
\ No newline at end of file
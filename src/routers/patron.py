@@ -1,6 +1,10 @@
-from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi import FastAPI, Depends, Path, Query, HTTPException, APIRouter, Request
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+from routers import uploads
+import models, schemas, crud, acrud
 
 router = APIRouter()
 
@@ -8,9 +12,19 @@ router = APIRouter()
 def create_patron(patron: schemas.CreatePatron, session: Session = Depends(crud.get_session)):
     return crud.create_patron(patron, session)
 
-@router.get("/all")
-def show_patrons(session: Session = Depends(crud.get_session)):
-    return crud.get_all_patrons(session)
+@router.post("/enroll")
+async def enroll_patrons(request: Request, session: Session = Depends(crud.get_session)):
+    with await uploads.spool_request(request) as stream:
+        return await run_in_threadpool(crud.enroll_patrons, stream, session)
+
+if ASYNC_MODE:
+    @router.get("/all")
+    async def show_patrons(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: str | None = None, session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_all_patrons(session, limit, after)
+else:
+    @router.get("/all")
+    def show_patrons(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: str | None = None, session: Session = Depends(crud.get_session)):
+        return crud.get_all_patrons(session, limit, after)
 
 @router.get("/count")
 def get_patron_count(session: Session = Depends(crud.get_session)):
@@ -21,6 +35,10 @@ def show_patrons_by_id(patron_id: str, session: Session = Depends(crud.get_sessi
     body = schemas.ReadPatron(patron_id=patron_id)
     return crud.get_patron_by_id(body, session)
 
+@router.get("/search")
+def search_patrons(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=crud.MAX_PAGE_SIZE), session: Session = Depends(crud.get_session)):
+    return crud.search_patrons(session, q, limit)
+
 @router.get("/name/{patron_name}")
 def show_patrons_by_name(patron_name, session: Session = Depends(crud.get_session)):
     return crud.get_patron_by_name(patron_name, session)
@@ -1,6 +1,8 @@
-from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from fastapi import FastAPI, Depends, Path, Query, HTTPException, APIRouter
 from sqlmodel import Session
-import models, schemas, crud
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import ASYNC_MODE
+import models, schemas, crud, acrud, typeahead
 
 router = APIRouter()
 
@@ -8,9 +10,18 @@ router = APIRouter()
 def create_publisher(publisher: schemas.CreatePublisher, session: Session = Depends(crud.get_session)):
     return crud.create_publisher(publisher, session)
 
-@router.get("/all")
-def show_publishers(session: Session = Depends(crud.get_session)):
-    return crud.get_all_publishers(session)
+if ASYNC_MODE:
+    @router.get("/all")
+    async def show_publishers(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: AsyncSession = Depends(acrud.get_async_session)):
+        return await acrud.get_all_publishers(session, limit, after)
+else:
+    @router.get("/all")
+    def show_publishers(limit: int = Query(crud.PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE), after: int | None = None, session: Session = Depends(crud.get_session)):
+        return crud.get_all_publishers(session, limit, after)
+
+@router.get("/autocomplete")
+def autocomplete_publishers(q: str = "", limit: int = Query(typeahead.TYPEAHEAD_LIMIT, ge=1, le=typeahead.TYPEAHEAD_MAX_LIMIT)):
+    return typeahead.suggest("publishers", q, limit)
 
 @router.get("/count")
 def get_publisher_count(session: Session = Depends(crud.get_session)):
@@ -0,0 +1,9 @@
+from fastapi import FastAPI, Depends, Path, HTTPException, APIRouter
+from sqlmodel import Session
+import models, schemas, crud
+
+router = APIRouter()
+
+@router.get("")
+def get_library_stats(session: Session = Depends(crud.get_session)):
+    return crud.get_library_stats(session)
\ No newline at end of file
@@ -0,0 +1,156 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime, time, timedelta, timezone
+from sqlmodel import Session
+from sqlalchemy import update
+from database import engine
+from models import SchedulerLease
+import crud
+import idempotency
+import migrations
+import logging
+import os
+import socket
+import sys
+import uuid
+
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "leader")
+LEASE_NAME = "scheduler"
+LEASE_TTL = timedelta(seconds=int(os.getenv("SCHEDULER_LEASE_TTL", "60")))
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+FINE_RUN_TIME = time(hour=11, minute=22, second=5)
+IDEMPOTENCY_PURGE_INTERVAL = int(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "3600"))
+OPTIMIZE_INTERVAL = int(os.getenv("DB_OPTIMIZE_SECONDS", "3600"))
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+def acquire_lease(session: Session, name: str = LEASE_NAME, holder: str = HOLDER_ID):
+    now = utcnow()
+    crud.upsert(session, SchedulerLease, [{"name": name, "holder": holder, "expires_at": now - LEASE_TTL}], ["name"])
+    result = session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .where((SchedulerLease.holder == holder) | (SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=now + LEASE_TTL)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+def release_lease(session: Session, name: str = LEASE_NAME, holder: str = HOLDER_ID):
+    session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .where(SchedulerLease.holder == holder)
+        .values(expires_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+def is_leader():
+    with Session(engine) as session:
+        return acquire_lease(session)
+
+def leader_only(job):
+    def run():
+        if not is_leader():
+            logging.info(f"{job.__name__}: skipped, another process holds the scheduler lease")
+            return
+        return job()
+    run.__name__ = job.__name__
+    return run
+
+def last_fine_date():
+    now = datetime.now()
+    if now.time() >= FINE_RUN_TIME:
+        return now.date()
+    return now.date() - timedelta(days=1)
+
+def calculate_patron_fines():
+    with Session(engine) as session:
+        crud.calculate_patron_fines(session, last_fine_date())
+
+def purge_idempotency_keys():
+    with Session(engine) as session:
+        purged = idempotency.purge_expired_keys(session)
+    logging.info(f"purge_idempotency_keys: removed {purged} expired keys")
+
+def optimize_database():
+    with engine.begin() as connection:
+        migrations.optimize_database(connection)
+
+def heartbeat():
+    if is_leader():
+        logging.debug(f"scheduler lease held by {HOLDER_ID}")
+
+def add_jobs(scheduler):
+    scheduler.add_job(
+        heartbeat,
+        trigger=IntervalTrigger(seconds=max(int(LEASE_TTL.total_seconds() // 3), 1)),
+        id='scheduler_heartbeat',
+        name='Scheduler Lease Heartbeat',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        leader_only(calculate_patron_fines),
+        trigger=CronTrigger(hour=FINE_RUN_TIME.hour, minute=FINE_RUN_TIME.minute, second=FINE_RUN_TIME.second),
+        id='calculate_patron_fines',
+        name='Calculate Patron Fines',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        leader_only(calculate_patron_fines),
+        id='catch_up_patron_fines',
+        name='Catch Up Patron Fines',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        leader_only(purge_idempotency_keys),
+        trigger=IntervalTrigger(seconds=IDEMPOTENCY_PURGE_INTERVAL),
+        id='purge_idempotency_keys',
+        name='Purge Expired Idempotency Keys',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        leader_only(optimize_database),
+        trigger=IntervalTrigger(seconds=OPTIMIZE_INTERVAL),
+        id='optimize_database',
+        name='Refresh Query Planner Statistics',
+        replace_existing=True
+    )
+    return scheduler
+
+def start_background_scheduler():
+    if SCHEDULER_MODE == "off":
+        logging.info("Scheduler disabled in this process (SCHEDULER_MODE=off)")
+        return None
+    scheduler = add_jobs(BackgroundScheduler())
+    scheduler.start()
+    return scheduler
+
+def stop_scheduler(scheduler):
+    if scheduler is None:
+        return
+    scheduler.shutdown(wait=False)
+    with Session(engine) as session:
+        release_lease(session)
+
+def main():
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    logging.info(f"Starting standalone scheduler {HOLDER_ID}...")
+    migrations.upgrade(engine)
+    scheduler = add_jobs(BlockingScheduler())
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        with Session(engine) as session:
+            release_lease(session)
+
+if __name__ == "__main__":
+    main()
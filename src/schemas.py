@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator, ValidationError, ValidationInfo
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ValidationError, ValidationInfo
 import re
 import datetime
 
@@ -173,6 +173,41 @@ class ReadBook(BaseModel):
 class ReadBookByTitle(BaseModel):
     title: str | None = Field(min_length=10, max_length=255)
 
+class ReadBookAvailability(BaseModel):
+    isbns: list[str] = Field(min_length=1, max_length=1000)
+
+    @field_validator('isbns', mode='before')
+    def validate_isbns(cls, value: list[str]):
+        return [ReadBook(isbn=isbn).isbn for isbn in value]
+
+class ImportBook(BaseModel):
+    isbn: str = Field(max_length=13, min_length=10)
+    title: str = Field(min_length=10, max_length=255)
+    genre: str = Field(min_length=1, max_length=25)
+    published_year: int
+    qty: int
+    author_first_name: str = Field(min_length=1, max_length=25)
+    author_initial_midname: str = Field(min_length=1, max_length=25)
+    author_last_name: str = Field(min_length=1, max_length=25)
+    publisher_name: str = Field(min_length=1, max_length=50)
+
+    @field_validator('isbn', mode='before')
+    def validate_isbn(cls, value: str):
+        return ReadBook(isbn=str(value)).isbn
+
+    @field_validator('qty')
+    def validate_qty(cls, value: int):
+        if value > 500 or value < 1:
+            raise ValueError('Order cannot have more than a 500 copies of a book, and orders cannot be of zero quantity')
+        return value
+
+    @field_validator('published_year')
+    def validate_published_year(cls, value: int):
+        current_year = datetime.datetime.now().year
+        if value < 1455 or value > current_year:
+            raise ValueError(f'Published year must be between 1455 and {current_year}')
+        return value
+
 class UpdateBook(BaseModel):
     title: str | None = Field(min_length=10, max_length=255, default=None)
     genre: str | None = Field(min_length=1, max_length=25, default=None)
@@ -246,10 +281,8 @@ class UpdatePublisher(BaseModel):
 class DeletePublisher(BaseModel):
     publisher_id: int
 
-class AddBorrow(BaseModel):
+class BorrowingPatron(BaseModel):
     patron_id: str
-    copy_id: int
-    borrow_date: datetime.date
 
     @field_validator('patron_id', mode='before')
     def validate_patron_id(cls, value: str):
@@ -263,5 +296,24 @@ class AddBorrow(BaseModel):
             raise ValueError('Invalid year of admission')        
         return value
 
+class AddBorrow(BorrowingPatron):
+    copy_id: int
+    borrow_date: datetime.date
+
+class AddBorrowBatch(BorrowingPatron):
+    copy_ids: list[int] = Field(min_length=1, max_length=50)
+    borrow_date: datetime.date
+
 class ReturnBorrow(BaseModel):
-    return_date: datetime.date
\ No newline at end of file
+    return_date: datetime.date
+
+class ReturnBorrowBatch(BaseModel):
+    return_date: datetime.date
+    transaction_ids: list[int] = Field(default=[], max_length=1000)
+    copy_ids: list[int] = Field(default=[], max_length=1000)
+
+    @model_validator(mode='after')
+    def validate_targets(self):
+        if not self.transaction_ids and not self.copy_ids:
+            raise ValueError('Provide at least one transaction_id or copy_id')
+        return self
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'biblio.db')}"
+
+from database import engine
+from models import Book, Borrows
+import migrations
+
+
+def seed_borrows(connection, count: int = 2000):
+    start = date(2025, 1, 1)
+    connection.execute(insert(Borrows), [
+        {
+            "patron_id": f"{number % 50:010d}",
+            "copy_id": number,
+            "borrow_date": start,
+            "due_date": start + timedelta(days=14),
+            "return_date": None if number % 20 == 0 else start + timedelta(days=7),
+        }
+        for number in range(count)
+    ])
+
+def seed_books(connection, count: int = 2000):
+    connection.execute(insert(Book), [
+        {
+            "isbn": f"{9780000000000 + number}",
+            "title": f"Book {number}",
+            "genre": f"Genre {number % 40}",
+            "author_id": number % 300,
+            "publisher_id": number % 60,
+            "published_year": 1900 + number % 120,
+            "qty": 1,
+        }
+        for number in range(count)
+    ])
+
+@pytest.fixture(scope="session")
+def connection():
+    migrations.upgrade(engine)
+    with engine.begin() as connection:
+        seed_books(connection)
+        seed_borrows(connection)
+        migrations.optimize_database(connection)
+    with engine.connect() as connection:
+        yield connection
+
+@pytest.fixture(scope="session")
+def query_plan(connection):
+    def plan(statement):
+        sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return plan
@@ -0,0 +1,19 @@
+from sqlmodel import Session
+from database import engine
+from models import Author
+import crud
+import typeahead
+
+
+def test_best_match_with_few_rare_trigrams_is_found(connection):
+    # the decoys hold every query trigram, including the rare ones the target lacks, but their long surnames score lower
+    target = Author(first_name="Maria", midname_initial="X", last_name="Lopes")
+    decoys = [Author(first_name="Maria", midname_initial="Lopez", last_name=f"Qzxvbkwyj{letter}") for letter in "abcdefgh"]
+    with Session(engine) as session:
+        session.add_all([target, *decoys])
+        session.flush()
+        crud.bulk_index_name_trigrams(session, "author", {author.id: typeahead.author_label(author) for author in [target, *decoys]})
+        session.commit()
+
+        matches = crud.search_names(session, "author", "maria lopez", 1)
+        assert [match["id"] for match in matches] == [target.id]
@@ -0,0 +1,44 @@
+from datetime import date
+from sqlalchemy import func
+from sqlmodel import Session
+from models import Book, Borrows
+import crud
+import pytest
+
+
+def uses_index(plan, index_name):
+    return any(detail.startswith(("SEARCH", "SCAN")) and index_name in detail.split() for detail in plan)
+
+def test_link_current_borrows_uses_open_copy_index(query_plan):
+    plan = query_plan(crud.link_current_borrows([1, 2, 3]))
+    assert uses_index(plan, "ix_borrows_open_copy_id"), plan
+
+def test_catalog_open_loans_read_only_open_borrows(query_plan):
+    plan = query_plan(crud.catalog_open_loans_query(["9780000000001"]))
+    assert uses_index(plan, "ix_borrows_open_copy_id") or uses_index(plan, "ix_borrows_open_patron_id"), plan
+
+def test_patron_open_loans_use_open_patron_index(query_plan):
+    plan = query_plan(crud.open_borrows_for_patron("0000000001", func.count(Borrows.id)))
+    assert uses_index(plan, "ix_borrows_open_patron_id"), plan
+
+def test_overdue_uses_partial_index(query_plan):
+    plan = query_plan(crud.overdue_bookcopies_query(date(2026, 1, 1)))
+    assert uses_index(plan, "ix_borrows_open_due_date"), plan
+
+@pytest.mark.parametrize("filters, index_name", [
+    ({"genre": "Genre 7"}, "ix_book_genre_isbn"),
+    ({"author_id": 7}, "ix_book_author_id_isbn"),
+    ({"publisher_id": 7}, "ix_book_publisher_id_isbn"),
+    ({"year_from": 2000, "year_to": 2001}, "ix_book_published_year"),
+])
+def test_book_filters_use_indexes(query_plan, filters, index_name):
+    plan = query_plan(crud.keyset_query(crud.book_filters(crud.select(Book), **filters), Book.isbn, crud.PAGE_SIZE, "9780000000100"))
+    assert uses_index(plan, index_name), plan
+
+@pytest.mark.parametrize("branch, index_name", [(0, "ix_borrows_open_due_date"), (1, "ix_borrows_returned_return_date")])
+def test_fine_accrual_batches_use_partial_indexes(query_plan, connection, branch, index_name):
+    since, through = date(2026, 2, 27), date(2026, 2, 28)
+    key, criteria = crud.fine_accrual_branches(since, through)[branch]
+    with Session(connection) as session:
+        batch = crud.fine_batch_query(session, since, through, key, criteria, date(2025, 1, 1), date(2025, 2, 1))
+    assert uses_index(query_plan(batch), index_name), query_plan(batch)
@@ -0,0 +1,19 @@
+from sqlmodel import Session
+from database import engine
+from models import Author
+import typeahead
+
+
+def test_refresh_picks_up_names_written_by_another_worker(connection):
+    typeahead.build_indexes()
+    with Session(engine) as session:
+        session.add(Author(first_name="Wislawa", midname_initial="M", last_name="Szymborska"))
+        session.commit()
+    assert typeahead.suggest("authors", "szymb") == []
+
+    typeahead.index_state["built_at"] -= typeahead.TYPEAHEAD_REFRESH
+    typeahead.suggest("authors", "szymb")
+    with typeahead.refresh_lock:
+        pass
+
+    assert [match["label"] for match in typeahead.suggest("authors", "szymb")] == ["Wislawa M Szymborska"]
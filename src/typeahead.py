@@ -0,0 +1,169 @@
+from bisect import bisect_left, insort
+from sqlmodel import Session, select
+from database import engine, web_workers
+from models import Author, Publisher, Book
+import logging
+import os
+import threading
+import time
+
+TYPEAHEAD_LIMIT = int(os.getenv("TYPEAHEAD_LIMIT", "10"))
+TYPEAHEAD_MAX_LIMIT = int(os.getenv("TYPEAHEAD_MAX_LIMIT", "50"))
+TYPEAHEAD_REFRESH = int(os.getenv("TYPEAHEAD_REFRESH_SECONDS", "30"))
+# writes from other workers only reach this process through a rebuild, so refreshing can only be turned off for a single worker
+if not TYPEAHEAD_REFRESH and web_workers() > 1:
+    logging.warning("TYPEAHEAD_REFRESH_SECONDS=0 ignored with WEB_CONCURRENCY > 1, refreshing every 30 s")
+    TYPEAHEAD_REFRESH = 30
+
+
+def normalize(text: str):
+    return " ".join(text.casefold().split())
+
+class PrefixIndex:
+    def __init__(self, word_starts: bool = False):
+        self.word_starts = word_starts
+        self.entries = []
+        self.labels = {}
+        self.journal = None
+        self.lock = threading.Lock()
+
+    def keys(self, label: str):
+        key = normalize(label)
+        if not self.word_starts:
+            return [key]
+        words = key.split(" ")
+        return [" ".join(words[start:]) for start in range(len(words))]
+
+    # updates that land while a snapshot is being read are journaled and replayed onto it
+    def begin_load(self):
+        with self.lock:
+            self.journal = []
+
+    def load(self, items):
+        entries = []
+        labels = {}
+        for id, label in items:
+            labels[id] = label
+            entries.extend((key, id) for key in self.keys(label))
+        entries.sort()
+        with self.lock:
+            self.entries = entries
+            self.labels = labels
+            journal, self.journal = self.journal or [], None
+            for id, label in journal:
+                self.discard(id)
+                if label is not None:
+                    self.labels[id] = label
+                    self.entries.extend((key, id) for key in self.keys(label))
+            if journal:
+                self.entries.sort()
+
+    def record(self, id, label: str | None):
+        if self.journal is not None:
+            self.journal.append((id, label))
+
+    def discard(self, id):
+        label = self.labels.pop(id, None)
+        if label is None:
+            return
+        for key in self.keys(label):
+            position = bisect_left(self.entries, (key, id))
+            if position < len(self.entries) and self.entries[position] == (key, id):
+                del self.entries[position]
+
+    def add(self, id, label: str):
+        with self.lock:
+            self.discard(id)
+            self.record(id, label)
+            self.labels[id] = label
+            for key in self.keys(label):
+                insort(self.entries, (key, id))
+
+    def add_many(self, items):
+        entries = []
+        with self.lock:
+            for id, label in items:
+                self.discard(id)
+                self.record(id, label)
+                self.labels[id] = label
+                entries.extend((key, id) for key in self.keys(label))
+            self.entries.extend(entries)
+            self.entries.sort()
+
+    def remove(self, *ids):
+        with self.lock:
+            for id in ids:
+                self.discard(id)
+                self.record(id, None)
+
+    def search(self, prefix: str, limit: int = TYPEAHEAD_LIMIT):
+        prefix = normalize(prefix)
+        matches = {}
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            while position < len(self.entries) and len(matches) < limit:
+                key, id = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                matches.setdefault(id, self.labels[id])
+                position += 1
+        return [{"id": id, "label": label} for id, label in matches.items()]
+
+def author_label(author: Author):
+    return f"{author.first_name} {author.midname_initial} {author.last_name}"
+
+INDEXES = {
+    "authors": PrefixIndex(word_starts=True),
+    "publishers": PrefixIndex(word_starts=True),
+    "titles": PrefixIndex(),
+}
+
+SOURCES = {
+    "authors": select(Author.id, Author.first_name + " " + Author.midname_initial + " " + Author.last_name),
+    "publishers": select(Publisher.id, Publisher.name),
+    "titles": select(Book.isbn, Book.title),
+}
+
+index_state = {"built_at": 0.0}
+refresh_lock = threading.Lock()
+
+def build_indexes():
+    started = time.monotonic()
+    with Session(engine) as session:
+        for name, operation in SOURCES.items():
+            INDEXES[name].begin_load()
+            INDEXES[name].load(session.execute(operation.execution_options(yield_per=10000)))
+    index_state["built_at"] = time.monotonic()
+    logging.info(f"Built typeahead indexes in {(index_state['built_at'] - started) * 1000:.0f} ms")
+
+def refresh_indexes():
+    try:
+        build_indexes()
+    finally:
+        refresh_lock.release()
+
+def refresh_if_stale():
+    if not TYPEAHEAD_REFRESH or time.monotonic() - index_state["built_at"] < TYPEAHEAD_REFRESH:
+        return
+    if not refresh_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=refresh_indexes, name="typeahead-refresh", daemon=True).start()
+
+def suggest(name: str, prefix: str, limit: int = TYPEAHEAD_LIMIT):
+    refresh_if_stale()
+    return INDEXES[name].search(prefix, limit)
+
+def index_author(author: Author):
+    INDEXES["authors"].add(author.id, author_label(author))
+
+def index_publisher(publisher: Publisher):
+    INDEXES["publishers"].add(publisher.id, publisher.name)
+
+def index_book(book: Book):
+    INDEXES["titles"].add(book.isbn, book.title)
+
+def index_books(books):
+    INDEXES["titles"].add_many((book["isbn"], book["title"]) for book in books)
+
+def unindex(name: str, *ids):
+    INDEXES[name].remove(*ids)
\ No newline at end of file